@@ -1,15 +1,34 @@
 import streamlit as st
 from game_manager import GameManager
 import game_config as config
-import battle_engine  
+import battle_engine
+import functools
+import itertools
 import random
+from collections import Counter
 import time
 import math
+import numpy as np
 from PIL import Image
 import requests
-from io import BytesIO
-import json
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Private RNG instance: skips the module-level indirection of the global
+# random functions and lets tests seed app rolls deterministically
+_RNG = random.Random()
+
+# Optional SIMD-accelerated resizer (Rust fast_image_resize bindings).
+# Falls back to PIL's scalar Lanczos if the wheel isn't installed.
+# except Exception, not ImportError: an incompatible wheel (3.x changed
+# the Resizer constructor, 4.x renamed the package) must degrade to the
+# PIL path instead of crashing the app at import
+try:
+    from cykooz.resizer import FilterType, ResizeAlg, Resizer
+    _resizer = Resizer(ResizeAlg.convolution(FilterType.lanczos3))
+except Exception:
+    _resizer = None
 
 # 1. Page Configuration
 st.set_page_config(
@@ -18,11 +37,18 @@ st.set_page_config(
     layout="wide"
 )
 
+# Process-wide NBA data manager: one SQLite connection and query cache
+# shared by every session instead of re-opened per GameManager
+@st.cache_resource(show_spinner=False)
+def get_data_manager():
+    import nba_data
+    return nba_data.NBADataManager()
+
 # 2. Initialize Game Engine & Session State
 if 'game_manager' not in st.session_state:
     with st.spinner("Initializing Game Engine..."):
         try:
-            st.session_state['game_manager'] = GameManager()
+            st.session_state['game_manager'] = GameManager(get_data_manager())
             st.success("Game Engine Initialized!")
             time.sleep(0.5)
             st.rerun()
@@ -34,6 +60,35 @@ if 'game_manager' not in st.session_state:
 gm = st.session_state['game_manager']
 state = gm.game_state
 
+# Per-rerun memoized accessors. These are called N x M times while
+# rendering roster/shop dropdowns; the script re-executes top to bottom
+# on every interaction, so the caches are rebuilt each rerun and can
+# never serve stale names after a purchase or sale.
+_parse_card_id = functools.lru_cache(maxsize=2048)(gm.parse_card_id)
+_name = functools.lru_cache(maxsize=2048)(gm.get_player_name)
+_display_name = functools.lru_cache(maxsize=4096)(gm.get_display_name)
+_tape_record = functools.lru_cache(maxsize=4096)(gm.get_tape_record_str)
+
+# Session-cached DB accessors: game logs cover fixed 2016-2025 seasons,
+# so they are pure functions of their arguments and safe to cache for
+# the whole session
+@st.cache_data(show_spinner=False, max_entries=4096)
+def _get_player_games(pid, season='2024-25'):
+    return gm.nba_manager.get_player_games(pid, season)
+
+@st.cache_data(show_spinner=False, max_entries=4096)
+def _get_game_moves(pid, game_id, calculate_labels=False):
+    return gm.nba_manager.get_game_moves(pid, game_id, calculate_labels)
+
+@st.cache_data(show_spinner=False, max_entries=2048)
+def _base_stats(card_id):
+    """Season stats plus derived base stats, cached per card."""
+    pid, season = gm.parse_card_id(card_id)
+    stats = gm.nba_manager.get_player_season_stats(pid, season)
+    if not stats:
+        return None, None
+    return stats, config.calculate_base_stats(stats)
+
 # Initialize Battle State if not present
 if 'active_battle' not in st.session_state:
     st.session_state['active_battle'] = None 
@@ -52,57 +107,154 @@ if 'current_tape_selection' not in st.session_state:
 
 # --- HELPER FUNCTIONS FOR UI ---
 
-@st.cache_data(show_spinner=False)
-def get_pixelated_headshot(player_id, pixel_size=64, reduce_colors=False):
+# Display order and pre-title-cased labels for move breakdowns, computed
+# once at import instead of per tape per rerun
+MOVE_ORDER = (
+    'attack', 'weak_attack', 'strong_attack', 'miss',
+    'defensive_rebound', 'offensive_rebound', 'assist',
+    'steal', 'block', 'turnover', 'foul'
+)
+MOVE_LABELS = {k: k.replace('_', ' ').title() for k in MOVE_ORDER}
+
+# Battle action deck: keys mirror BattleUnit.action_deck
+ACTION_KEYS = ('attack', 'defensive_rebound', 'offensive_rebound',
+               'assist', 'steal', 'block')
+ACTION_IDX = battle_engine.ACTION_IDX
+ACTION_BUTTONS = (('attack', 'Attack'), ('defensive_rebound', 'D-Reb'),
+                  ('offensive_rebound', 'O-Reb'), ('assist', 'Assist'),
+                  ('steal', 'Steal'), ('block', 'Block'))
+
+# 5v5 coaching strategies (must match battle_engine weighting logic)
+OFF_STRATS = ("Feed the Hot Hand", "Ball Movement", "Crash the Glass", "7 Seconds or Less")
+DEF_STRATS = ("Lockdown Paint", "Full Court Press", "Box Out", "Switch Everything")
+
+# Token payouts per battle type: (win, loss)
+REWARDS = {
+    '1v1': (config.TOKENS_WIN_1V1, config.TOKENS_LOSE_1V1),
+    '5v5': (config.TOKENS_WIN_5V5, config.TOKENS_LOSE_5V5),
+}
+
+# On-disk headshot cache survives process restarts (st.cache_data does not)
+HEADSHOT_CACHE_DIR = os.path.join('cache', 'headshots')
+os.makedirs(HEADSHOT_CACHE_DIR, exist_ok=True)
+
+# Shared session reuses the TCP/TLS connection to cdn.nba.com across
+# requests (and across prefetch threads)
+_http = requests.Session()
+
+# Headshots refresh daily; both the in-memory entry and the on-disk PNG
+# expire on the same window so the CDN is actually re-fetched
+HEADSHOT_TTL_SECONDS = 24 * 60 * 60
+
+# cache_resource skips st.cache_data's pickle+hash of the returned Image
+# on every hit; the Image is treated as read-only by all callers
+@st.cache_resource(ttl=HEADSHOT_TTL_SECONDS, show_spinner=False)
+def get_pixelated_headshot(player_id, pixel_size=64):
     """
     Downloads player headshot and creates a retro pixel art effect.
+    Results are persisted to a local PNG cache so cold starts skip the
+    network fetch and the whole resize pipeline.
     """
+    cache_path = os.path.join(HEADSHOT_CACHE_DIR, f"{player_id}_{pixel_size}.png")
+    try:
+        if os.path.exists(cache_path):
+            if time.time() - os.path.getmtime(cache_path) < HEADSHOT_TTL_SECONDS:
+                cached = Image.open(cache_path)
+                cached.load()
+                return cached
+            # Stale file: drop it so the fetch below refreshes the cache
+            os.remove(cache_path)
+    except Exception:
+        pass  # Corrupt cache file: fall through and regenerate
+
     try:
         url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
-        response = requests.get(url)
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-            
-            # Convert to RGBA immediately to avoid palette warnings
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            
-            # Crop to focus on the face (NBA headshots have consistent framing)
-            width, height = img.size
-            left = width * 0.2
-            right = width * 0.8
-            top = height * 0.05
-            bottom = height * 0.75
-            img = img.crop((int(left), int(top), int(right), int(bottom)))
-            
-            # Convert RGBA to RGB with black background
-            background = Image.new('RGB', img.size, (0, 0, 0))
-            background.paste(img, mask=img.split()[3])
-            img = background
-            
-            # Downscale with high-quality resampling
+        # Stream straight from the socket into the PNG decoder instead of
+        # buffering the body into bytes and re-wrapping it in BytesIO
+        with _http.get(url, stream=True, timeout=5) as response:
+            if response.status_code != 200:
+                return None
+            response.raw.decode_content = True
+            img = Image.open(response.raw)
+            img.load()
+
+        # NBA CDN headshots are always RGBA PNGs; the composite below
+        # relies on the alpha channel being present
+        # Cheap box-filter prefilter down to ~256px: convolution cost
+        # scales with source pixels, and the final target is only 64px,
+        # so running Lanczos on the full 1040x760 source wastes work
+        img.thumbnail((256, 256), Image.BOX)
+
+        # Crop to focus on the face (NBA headshots have consistent framing)
+        width, height = img.size
+        left = width * 0.2
+        right = width * 0.8
+        top = height * 0.05
+        bottom = height * 0.75
+        img = img.crop((int(left), int(top), int(right), int(bottom)))
+
+        # Composite RGBA onto black in one vectorized pass instead of
+        # allocating a second PIL image and doing a masked paste
+        arr = np.asarray(img)
+        rgb = ((arr[..., :3].astype(np.uint16) * arr[..., 3:4]) // 255).astype(np.uint8)
+        img = Image.fromarray(rgb, 'RGB')
+
+        # Downscale with high-quality resampling
+        # (vectorized SSE/AVX/NEON kernels when cykooz.resizer is available)
+        if _resizer is not None:
+            small = Image.new('RGB', (pixel_size, pixel_size))
+            _resizer.resize_pil(img, small)
+        else:
             small = img.resize((pixel_size, pixel_size), resample=Image.LANCZOS)
-            
-            # Reduce color palette for 8-bit aesthetic
-            if reduce_colors:
-                small = small.quantize(colors=64, dither=Image.Dither.NONE).convert('RGB')
-            
-            # Upscale with NEAREST for crisp pixels
-            result = small.resize((128, 128), resample=Image.NEAREST)
-            
-            return result
-        return None
+
+        # Upscale with NEAREST for crisp pixels
+        result = small.resize((128, 128), resample=Image.NEAREST)
+
+        try:
+            result.save(cache_path, 'PNG', optimize=True)
+        except Exception:
+            pass  # Cache write failure is non-fatal
+
+        return result
     except Exception as e:
         print(f"Error processing headshot: {e}")
         return None
 
+def prefetch_headshots(player_ids, pixel_size=64):
+    """Warm the headshot caches for a batch of players concurrently.
+
+    Downloads are I/O bound, so issuing them in parallel collapses page
+    load from N round-trips to roughly one. Subsequent per-row calls hit
+    the cache synchronously.
+    """
+    pids = [p for p in player_ids if p]
+    if len(pids) > 1:
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            list(ex.map(lambda p: get_pixelated_headshot(p, pixel_size), pids))
+
 def render_health_bar(current, max_hp, label="HP"):
     pct = max(0.0, min(1.0, current / max_hp))
     st.write(f"**{label}**: {math.ceil(current)}/{math.ceil(max_hp)}")
     st.progress(pct)
 
+@functools.lru_cache(maxsize=2048)
+def unit_status_text(atk_b, def_b, labels):
+    """Buff/label caption for a 5v5 unit; '' when there is nothing to show.
+
+    Cached on the (buffs, labels) tuple: buff values repeat constantly
+    across the 10 units and across reruns, so the joins run only on new
+    combinations."""
+    parts = []
+    if atk_b != 0:
+        parts.append(f"ATK:{atk_b:+d}")
+    if def_b != 0:
+        parts.append(f"DEF:{def_b:+d}")
+    if labels:
+        parts.append(f"[{', '.join(labels)}]")
+    return " | ".join(parts)
+
 def get_player_id_from_card(card_id):
-    pid, _ = gm.parse_card_id(card_id)
+    pid, _ = _parse_card_id(card_id)
     return pid
 
 # 3. Sidebar Navigation
@@ -138,6 +290,10 @@ if 'menu_choice' not in st.session_state:
 
 choice = st.session_state['menu_choice']
 
+# Player display names resolved once per rerun and shared by the shop
+# and battle branches instead of rebuilding the dict per tab
+player_names_all = {cid: _name(cid) for cid in state.get('player_cards', [])}
+
 # --- MAIN PAGES ---
 
 if choice == 'main':
@@ -178,8 +334,16 @@ elif choice == 'settings':
     
     with col1:
         st.subheader("Download Save")
-        # Convert state to JSON string
-        save_json = json.dumps(state, indent=2)
+
+        # Serialize once per state version instead of on every rerun of
+        # this page; the leading-underscore arg is excluded from the cache
+        # key so only the version counter is hashed
+        @st.cache_data(show_spinner=False, max_entries=4)
+        def _serialize_save(version, _game_state):
+            # orjson emits bytes, which download_button accepts directly
+            return orjson.dumps(_game_state)
+
+        save_json = _serialize_save(state.get('_version', 0), state)
         st.download_button(
             label="⬇️ Download Save File",
             data=save_json,
@@ -196,12 +360,13 @@ elif choice == 'settings':
             if st.button("Load Uploaded Save"):
                 try:
                     # Read file
-                    content = json.load(uploaded_file)
+                    content = orjson.loads(uploaded_file.read())
                     
                     # Basic validation
                     if 'tokens' in content and 'player_cards' in content:
                         # Update Game State
                         gm.game_state.update(content)
+                        gm.migrate_save_schema()  # Uploaded file may use the old tape schema
                         gm.save_game() # Save to local disk
                         st.success("Save file loaded successfully!")
                         time.sleep(1)
@@ -289,9 +454,12 @@ elif choice == 'roster':
     st.header("Your Roster")
     if not state.get('player_cards'):
         st.warning("No players! Visit the Shop.")
-    
+
+    prefetch_headshots([get_player_id_from_card(cid) for cid in state.get('player_cards', [])])
+
+
     for i, card_id in enumerate(state.get('player_cards', [])):
-        name = gm.get_player_name(card_id)
+        name = _name(card_id)
         pid = get_player_id_from_card(card_id)
         
         with st.expander(f"🏀 {name}", expanded=(i==0)):
@@ -302,8 +470,10 @@ elif choice == 'roster':
 
                 if i > 0:
                     if st.button("⬆️ Move to Top", key=f"move_top_{card_id}"):
-                        state['player_cards'].remove(card_id)
-                        state['player_cards'].insert(0, card_id)
+                        # Index is already known from enumerate; skip the
+                        # linear remove() scan
+                        pc = state['player_cards']
+                        pc.insert(0, pc.pop(i))
                         gm.save_game()
                         st.rerun()
                 
@@ -312,9 +482,8 @@ elif choice == 'roster':
                 st.write(f"**Record:** {rec['wins']}W - {rec['losses']}L")
                 
                 # Base Stats
-                stats = gm.nba_manager.get_player_season_stats(pid, gm.parse_card_id(card_id)[1])
-                if stats:
-                    base = config.calculate_base_stats(stats)
+                stats, base = _base_stats(card_id)
+                if base:
                     st.caption(f"Base: HP {base['hp']:.0f} | ATK {base['attack']:.1f} | DEF {base['defense']:.1f}")
 
                 st.divider()
@@ -322,19 +491,19 @@ elif choice == 'roster':
                 if tapes:
                     st.write("**Equipped Gametapes:**")
                     for tid in tapes:
-                        t_name = gm.get_display_name(tid)
-                        t_rec = gm.get_tape_record_str(tid)
+                        t_name = _display_name(tid)
+                        t_rec = _tape_record(tid)
                         
                         # --- ENHANCED GAMETAPE DETAILS ---
                         game_id = tid.split('_')[1]
-                        moves_data = gm.nba_manager.get_game_moves(pid, game_id)
+                        moves_data = _get_game_moves(pid, game_id)
                         
                         st.markdown(f"**{t_name}** {t_rec}")
                         
                         # Calculate Stat Changes
                         game_stats = moves_data.get('game_stats', {}) # Need to ensure this is passed or fetch again
                         # For now, fetching game logic directly:
-                        games = gm.nba_manager.get_player_games(pid) 
+                        games = _get_player_games(pid) 
                         target_game = next((g for g in games if str(g['game_id']) == str(game_id)), None)
                         
                         if target_game and stats:
@@ -345,18 +514,10 @@ elif choice == 'roster':
 
                         # List Moves Breakdown
                         moves = moves_data.get('moves', [])
-                        counts = {}
-                        for m in moves:
-                            counts[m['type']] = counts.get(m['type'], 0) + 1
-                        
-                        move_order = [
-                            'attack', 'weak_attack', 'strong_attack', 'miss',
-                            'defensive_rebound', 'offensive_rebound', 'assist',
-                            'steal', 'block', 'turnover', 'foul'
-                        ]
+                        counts = Counter(m['type'] for m in moves)
 
                         # Format as chips/text
-                        move_str = " | ".join([f"{k.replace('_',' ').title()}: {counts[k]}" for k in move_order if k in counts])
+                        move_str = " | ".join(f"{MOVE_LABELS[k]}: {counts[k]}" for k in MOVE_ORDER if k in counts)
                         st.caption(f"Moves: {move_str}")
                         st.markdown("---")
                 else:
@@ -383,17 +544,19 @@ elif choice == 'roster':
                     player_tapes[player_id] = []
                 player_tapes[player_id].append(tape_id)
         
+        # Resolve all HoF player names in a single IN-clause query instead
+        # of one round-trip per player
+        try:
+            ids = [int(pid) for pid in player_tapes]
+            q = f"SELECT id, full_name FROM players WHERE id IN ({','.join('?' * len(ids))})"
+            hof_names = {r['id']: r['full_name'] for r in gm.nba_manager.conn.execute(q, ids)}
+        except:
+            hof_names = {}
+
         # Display grouped by player
         for player_id, tapes in player_tapes.items():
-            # Get player name from database
-            try:
-                cursor = gm.nba_manager.conn.cursor()
-                cursor.execute("SELECT full_name FROM players WHERE id=?", (int(player_id),))
-                row = cursor.fetchone()
-                player_name = row['full_name'] if row else f"Player {player_id}"
-            except:
-                player_name = f"Player {player_id}"
-            
+            player_name = hof_names.get(int(player_id), f"Player {player_id}")
+
             # Display player entry
             hof_col1, hof_col2 = st.columns([1, 4])
             
@@ -410,7 +573,7 @@ elif choice == 'roster':
                 # List all tapes for this player
                 for tape_id in tapes:
                     game_id = tape_id.split('_')[1]
-                    tape_name = state.get('gametape_metadata', {}).get(tape_id, tape_id)
+                    tape_name = state.get('tapes', {}).get(tape_id, {}).get('name', tape_id)
                     box_score_url = f"https://www.nba.com/game/{game_id}/box-score"
                     
                     st.caption(f"📼 {tape_name}")
@@ -423,12 +586,12 @@ elif choice == 'shop':
     st.header("🛒 The Shop")
     
     tab_buy, tab_sell = st.tabs(["Buy Items", "Sell Items"])
-    
+
     with tab_buy:
         c1, c2 = st.columns(2)
         with c1:
             st.subheader(f"Buy Gametape ({config.GAMETAPE_COST} Tokens)")
-            player_options = {cid: gm.get_player_name(cid) for cid in state.get('player_cards', [])}
+            player_options = player_names_all
             if player_options:
                 sel_card = st.selectbox("Player:", options=list(player_options.keys()), format_func=lambda x: player_options[x])
                 if st.button("Buy Tape"):
@@ -451,31 +614,37 @@ elif choice == 'shop':
                 else:
                     with st.spinner("Scouting..."):
                         pool = gm.nba_manager.get_available_card_pool()
+                        owned = set(state['player_cards'])  # O(1) duplicate checks in the loop
                         found = False
                         for _ in range(50):
-                            cand = random.choice(pool)
+                            cand = _RNG.choice(pool)
                             cid = f"{cand['id']}_{cand['season']}"
-                            if cid in state['player_cards']: continue
+                            if cid in owned: continue
                             stats = gm.nba_manager.get_player_season_stats(cand['id'], cand['season'])
                             if not stats: continue
                             
-                            games = gm.nba_manager.get_player_games(cand['id'], cand['season'])
+                            games = _get_player_games(cand['id'], cand['season'])
                             valid_tape = None
                             if games:
-                                for g in random.sample(games, min(5, len(games))):
-                                    m = gm.nba_manager.get_game_moves(cand['id'], g['game_id'], calculate_labels=True)
+                                # Validate without labels first; label detection
+                                # is the expensive part and validity doesn't
+                                # depend on it
+                                for g in _RNG.sample(games, min(5, len(games))):
+                                    m = _get_game_moves(cand['id'], g['game_id'])
                                     if gm.nba_manager.validate_gametape(m, g)[0]:
-                                        valid_tape = g; valid_labels = m.get('labels', []); break
-                            
+                                        valid_tape = g; break
+
                             if valid_tape:
+                                # Compute labels once, only for the winning game
+                                m = _get_game_moves(cand['id'], valid_tape['game_id'], calculate_labels=True)
+                                valid_labels = m.get('labels', [])
                                 state['tokens'] -= config.PLAYER_CARD_COST
                                 state['player_cards'].append(cid)
                                 state['player_records'][cid] = {'wins':0, 'losses':0}
                                 tid = f"{cand['id']}_{valid_tape['game_id']}"
                                 state['gametapes'][cid] = [tid]
-                                state['gametape_records'][tid] = {'wins':0, 'losses':0}
                                 tname = gm.create_gametape_display_name(valid_tape, stats, valid_labels)
-                                state['gametape_metadata'][tid] = tname
+                                state['tapes'][tid] = {'wins': 0, 'losses': 0, 'name': tname}
                                 gm.save_game()
                                 st.success(f"Drafted: {cand['full_name']} ({cand['season']})")
                                 found = True
@@ -491,9 +660,9 @@ elif choice == 'shop':
             st.subheader(f"Sell Gametape (+{config.GAMETAPE_SELL_VALUE} Token)")
             all_tapes = []
             for cid, tapes in state['gametapes'].items():
-                p_name = gm.get_player_name(cid)
+                p_name = _name(cid)
                 for tid in tapes:
-                    t_name = gm.get_display_name(tid)
+                    t_name = _display_name(tid)
                     all_tapes.append( (tid, f"{p_name} | {t_name}", cid) )
             
             if not all_tapes:
@@ -517,7 +686,7 @@ elif choice == 'shop':
             if len(state['player_cards']) <= 1:
                 st.warning("Must keep at least 1 player.")
             else:
-                p_opts_sell = {cid: gm.get_player_name(cid) for cid in state['player_cards']}
+                p_opts_sell = player_names_all
                 sel_p_sell = st.selectbox("Select Player to Sell:", options=list(p_opts_sell.keys()), format_func=lambda x: p_opts_sell[x], key="sell_player_select")
                 
                 if st.button("Confirm Release Player", key="btn_sell_player"):
@@ -537,10 +706,10 @@ elif choice == 'battle':
     
     if st.session_state['active_battle'] is None:
         tab1, tab2 = st.tabs(["1v1 Duel", "5v5 Team Battle"])
-        
+
         with tab1:
             st.subheader("Quick Battle Setup")
-            p_opts = {cid: gm.get_player_name(cid) for cid in state.get('player_cards', [])}
+            p_opts = player_names_all
             
             if not p_opts:
                 st.warning("No players available.")
@@ -555,16 +724,16 @@ elif choice == 'battle':
                 with c2:
                     tapes = state['gametapes'].get(sel_p, [])
                     if tapes:
-                        t_opts = {tid: f"{gm.get_display_name(tid)} {gm.get_tape_record_str(tid)}" for tid in tapes}
+                        t_opts = {tid: f"{_display_name(tid)} {_tape_record(tid)}" for tid in tapes}
                         sel_t = st.selectbox("Select Gametape", list(t_opts.keys()), format_func=lambda x: t_opts[x])
                         
-                        if st.button("START DUEL"):
+                        if st.button("START DUEL", key="start_1v1"):
                             p_unit = gm.create_battle_unit(sel_p, sel_t, calculate_labels=True)
                             o_unit = gm.generate_random_opponent()
                             
                             if p_unit and o_unit:
                                 st.session_state['battle_tracking'] = {'type': '1v1', 'pid': sel_p, 'tid': sel_t}
-                                st.session_state['active_battle'] = battle_engine.Battle(p_unit, o_unit)
+                                st.session_state['active_battle'] = battle_engine.Battle(p_unit, o_unit, verbose=False)
                                 st.session_state['battle_mode'] = '1v1'
                                 st.rerun()
                             else:
@@ -575,7 +744,7 @@ elif choice == 'battle':
         with tab2:
             st.subheader("🏀 Coach Mode - Build Your Roster")
             wins = state.get('total_wins', 0)
-            valid_players = [cid for cid in state['player_cards'] if state['gametapes'].get(cid)]
+            valid_players = gm.get_valid_roster()
             valid_count = len(valid_players)
             
             if wins < config.GAMES_TO_UNLOCK_5V5 or valid_count < 5:
@@ -586,7 +755,8 @@ elif choice == 'battle':
                 st.info("Select 5 players and their gametapes for your starting lineup.")
                 
                 # Get already selected player IDs to prevent duplicates
-                selected_player_ids = [sel[0] for sel in st.session_state['roster_5v5_selections']]
+                # Set membership keeps the availability filter linear
+                selected_player_ids = {sel[0] for sel in st.session_state['roster_5v5_selections']}
                 
                 # Filter available players (exclude already selected)
                 available_players = [cid for cid in valid_players if cid not in selected_player_ids]
@@ -597,9 +767,9 @@ elif choice == 'battle':
                     for i, (cid, tid) in enumerate(st.session_state['roster_5v5_selections']):
                         col_name, col_tape, col_remove = st.columns([2, 3, 1])
                         with col_name:
-                            st.write(f"**{i+1}.** {gm.get_player_name(cid)}")
+                            st.write(f"**{i+1}.** {_name(cid)}")
                         with col_tape:
-                            st.caption(f"📼 {gm.get_display_name(tid)}")
+                            st.caption(f"📼 {_display_name(tid)}")
                         with col_remove:
                             if st.button("❌", key=f"remove_{i}"):
                                 st.session_state['roster_5v5_selections'].pop(i)
@@ -618,7 +788,7 @@ elif choice == 'battle':
                             st.warning("No more players available!")
                             selected_player = None
                         else:
-                            player_options = {cid: gm.get_player_name(cid) for cid in available_players}
+                            player_options = {cid: _name(cid) for cid in available_players}
                             selected_player = st.selectbox(
                                 "Player:",
                                 options=list(player_options.keys()),
@@ -633,7 +803,7 @@ elif choice == 'battle':
                             tapes = state['gametapes'].get(selected_player, [])
                             if tapes:
                                 tape_options = {
-                                    tid: f"{gm.get_display_name(tid)} {gm.get_tape_record_str(tid)}" 
+                                    tid: f"{_display_name(tid)} {_tape_record(tid)}" 
                                     for tid in tapes
                                 }
                                 selected_tape = st.selectbox(
@@ -652,7 +822,7 @@ elif choice == 'battle':
                     
                     # Add to roster button
                     if selected_player and selected_tape:
-                        if st.button("➕ Add to Lineup", type="secondary", use_container_width=True):
+                        if st.button("➕ Add to Lineup", type="secondary", use_container_width=True, key="add_to_lineup"):
                             st.session_state['roster_5v5_selections'].append((selected_player, selected_tape))
                             st.rerun()
                 
@@ -661,7 +831,7 @@ elif choice == 'battle':
                 btn_col1, btn_col2 = st.columns(2)
                 
                 with btn_col1:
-                    if st.button("🗑️ Clear Roster", use_container_width=True):
+                    if st.button("🗑️ Clear Roster", use_container_width=True, key="clear_5v5_roster"):
                         st.session_state['roster_5v5_selections'] = []
                         st.rerun()
                 
@@ -671,7 +841,8 @@ elif choice == 'battle':
                         "🏀 START SEASON GAME", 
                         type="primary", 
                         disabled=not roster_ready,
-                        use_container_width=True
+                        use_container_width=True,
+                        key="start_5v5"
                     ):
                         # Build team from selections
                         team_units = []
@@ -684,12 +855,11 @@ elif choice == 'battle':
                                 track_info.append((cid, tid))
                         
                         # Generate opponent team
-                        opp_units = [gm.generate_random_opponent() for _ in range(5)]
-                        opp_units = [u for u in opp_units if u]
+                        opp_units = gm.generate_random_opponents(5)
                         
                         if len(team_units) == 5 and len(opp_units) == 5:
                             st.session_state['battle_tracking'] = {'type': '5v5', 'roster': track_info}
-                            st.session_state['active_battle'] = battle_engine.Battle5v5(team_units, opp_units)
+                            st.session_state['active_battle'] = battle_engine.Battle5v5(team_units, opp_units, verbose=False)
                             st.session_state['battle_mode'] = '5v5'
                             # Clear roster selections for next game
                             st.session_state['roster_5v5_selections'] = []
@@ -702,18 +872,58 @@ elif choice == 'battle':
     else:
         battle = st.session_state['active_battle']
         mode = st.session_state['battle_mode']
-        
+
+        def finalize_battle(won):
+            """Apply rewards, records and the save exactly once per battle.
+
+            Called from the action that ends the battle so the victory
+            screen render only reads state; guarded by reward_claimed so
+            the render-time fallback call stays idempotent."""
+            if 'reward_claimed' in st.session_state:
+                return
+            track = st.session_state['battle_tracking']
+            key = 'wins' if won else 'losses'
+            win_tokens, loss_tokens = REWARDS[track['type']]
+            state['tokens'] += win_tokens if won else loss_tokens
+            if won:
+                state['total_wins'] += 1
+            if track['type'] == '5v5':
+                pairs = track['roster']
+            else:
+                pairs = [(track['pid'], track['tid'])]
+            # Bind the record tables once instead of re-indexing state
+            # on every loop iteration
+            player_records = state['player_records']
+            tapes = state['tapes']
+            for cid, tid in pairs:
+                player_records[cid][key] += 1
+                tapes[tid][key] += 1
+                gm.check_retirement(tid, cid)
+            gm.mark_dirty()
+            st.session_state['reward_claimed'] = True
+
         # 1v1 INTERFACE
-        if mode == '1v1':
+        # Fragments scope per-turn reruns to the battle view only; the rest
+        # of the page (sidebar, menus) is not re-executed for every action
+        @st.fragment
+        def battle_1v1_view():
             p = battle.player
             o = battle.opponent
-            
+
+            # Header images keyed in session state: turn reruns skip even
+            # the cache-key hashing of get_pixelated_headshot and reuse
+            # the decoded images for the whole battle
+            hdr_imgs = st.session_state.setdefault('hdr_imgs', {})
+            for hdr_pid in (p.player_id, o.player_id):
+                if hdr_pid not in hdr_imgs:
+                    hdr_imgs[hdr_pid] = get_pixelated_headshot(hdr_pid, pixel_size=64)
+
             # --- BATTLE HEADER WITH IMAGES ---
             c1, c2, c3 = st.columns([2, 1, 2])
             with c1:
                 st.info(f"YOU: {p.name}")
                 # Get Player Image
-                p_img = get_pixelated_headshot(p.player_id, pixel_size=64)
+                p_img = hdr_imgs[p.player_id]
                 if p_img: st.image(p_img, width=150)
                 
                 render_health_bar(p.current_hp, p.max_hp)
@@ -730,20 +940,20 @@ elif choice == 'battle':
                     st.caption(f"{buff_color} Def Buff: {p.defense_buff_stacks:+d}")
                 
             with c2:
-                st.markdown(f"<h1 style='text-align: center;'>VS</h1>", unsafe_allow_html=True)
-                st.markdown(f"<p style='text-align: center;'>Turn {battle.turn_count}</p>", unsafe_allow_html=True)
+                # Static markdown: no HTML sanitization pass per turn rerun
+                st.markdown("# VS")
+                st.caption(f"Turn {battle.turn_count}")
                 
             with c3:
                 st.error(f"OPP: {o.name}")
                 # Get Opponent Image
-                o_img = get_pixelated_headshot(o.player_id, pixel_size=64)
+                o_img = hdr_imgs[o.player_id]
                 if o_img: st.image(o_img, width=150)
                 
                 render_health_bar(o.current_hp, o.max_hp)
                 st.caption(f"⚔️ ATK: {o.attack:.0f} | 🛡️ DEF: {o.defense:.0f} | ⭐ PWR: {o.power_rating}")
                 
-                tape_name = gm.create_gametape_display_name(o.gametape['game_stats'], o.season_stats, o.labels)
-                st.caption(f"📼 Tape: {tape_name}")
+                st.caption(f"📼 Tape: {o.tape_display_name}")
                 
                 # Show labels if any
                 if o.labels:
@@ -762,51 +972,14 @@ elif choice == 'battle':
             # Game Over Check
             if not p.is_alive() or not o.is_alive():
                 winner = p if p.is_alive() else o
+                # Fallback for battles ended outside perform_action
+                finalize_battle(winner == p)
                 if winner == p:
                     st.success("🏆 VICTORY!")
-                    if 'reward_claimed' not in st.session_state:
-                        track = st.session_state['battle_tracking']
-                        # Check if this is OT from 5v5 or regular 1v1    
-                        if track['type'] == '5v5':
-                            # 5v5 overtime win - use 5v5 rewards
-                            state['tokens'] += config.TOKENS_WIN_5V5
-                            state['total_wins'] += 1
-                            for cid, tid in track['roster']:
-                                state['player_records'][cid]['wins'] += 1
-                                state['gametape_records'][tid]['wins'] += 1
-                                gm.check_retirement(tid, cid)
-                        else:
-                            # regular 1v1 win
-                            state['tokens'] += config.TOKENS_WIN_1V1
-                            state['total_wins'] += 1
-                            state['player_records'][track['pid']]['wins'] += 1
-                            state['gametape_records'][track['tid']]['wins'] += 1
-                            gm.check_retirement(track['tid'], track['pid'])
-                        gm.save_game()
-                        st.session_state['reward_claimed'] = True
                 else:
                     st.error("💀 DEFEAT")
-                    if 'reward_claimed' not in st.session_state:
-                        track = st.session_state['battle_tracking']
-
-                        # check if this is OT from 5v5 or regular 1v1
-                        if track['type'] == '5v5':
-                            # 5v5 overtime loss - use 5v5 rewards
-                            state['tokens'] += config.TOKENS_LOSE_5V5
-                            for cid, tid in track['roster']:
-                                state['player_records'][cid]['losses'] += 1
-                                state['gametape_records'][tid]['losses'] += 1
-                                gm.check_retirement(tid, cid)
-                        else:
-                            #regular 1v1 loss
-                            state['tokens'] += config.TOKENS_LOSE_1V1
-                            state['player_records'][track['pid']]['losses'] += 1
-                            state['gametape_records'][track['tid']]['losses'] += 1
-                            gm.check_retirement(track['tid'], track['pid'])
-                        gm.save_game()
-                        st.session_state['reward_claimed'] = True
-                
-                if st.button("Return to Arena"):
+
+                if st.button("Return to Arena", key="return_1v1"):
                     st.session_state['active_battle'] = None
                     if 'reward_claimed' in st.session_state: del st.session_state['reward_claimed']
                     st.rerun()
@@ -821,91 +994,88 @@ elif choice == 'battle':
                     row2 = st.columns(3)
                     
                     def perform_action(action_key):
-                        p.action_deck[action_key] -= 1
+                        p.action_deck[ACTION_IDX[action_key]] -= 1
                         battle.resolve_action(p, o, action_key)
                         if o.is_alive():
                            #check if opponent deck is empty and refill
                             if o.deck_is_empty():
                                 o.refill_deck(0.5)
-                            avail = [k for k, v in o.action_deck.items() if v > 0]
-                            if avail:
-                                ai_act = random.choice(avail)
-                                o.action_deck[ai_act] -= 1
-                                battle.resolve_action(o, p, ai_act)
-                        st.rerun()
+                            # Weighted pick over the fixed key tuple: actions
+                            # the opponent has more of are played more often
+                            weights = o.action_deck
+                            if any(weights):
+                                ai_idx = _RNG.choices(range(6), weights=weights)[0]
+                                o.action_deck[ai_idx] -= 1
+                                battle.resolve_action(o, p, ACTION_KEYS[ai_idx])
+                        # Grant rewards on the turn the battle ends, not
+                        # during the victory-screen render
+                        if not p.is_alive() or not o.is_alive():
+                            finalize_battle(p.is_alive())
+                        st.rerun(scope="fragment")
 
-                    actions = [('attack', 'Attack'), ('defensive_rebound', 'D-Reb'), ('offensive_rebound', 'O-Reb'),
-                               ('assist', 'Assist'), ('steal', 'Steal'), ('block', 'Block')]
-                    
-                    for i, (key, label) in enumerate(actions):
-                        count = p.action_deck[key]
+                    for i, (key, label) in enumerate(ACTION_BUTTONS):
+                        count = p.action_deck[i]
                         btn_col = row1 if i < 3 else row2
-                        if btn_col[i%3].button(f"{label} ({count})", disabled=(count==0), use_container_width=True):
+                        if btn_col[i%3].button(f"{label} ({count})", disabled=(count==0), use_container_width=True, key=f"act_{key}"):
                             perform_action(key)
                     
                     if p.deck_is_empty():
                         st.warning("Deck Empty! Actions reset.")
                         p.refill_deck(0.25)
-                        st.rerun()
-                        
-                    if st.button(f"Timeout ({p.timeouts_remaining})"):
+                        st.rerun(scope="fragment")
+
+                    if st.button(f"Timeout ({p.timeouts_remaining})", key="timeout_1v1"):
                         if p.timeouts_remaining > 0:
                             battle.execute_timeout(p)
-                            st.rerun()
+                            st.rerun(scope="fragment")
 
                 with b_col2:
                     st.subheader("Battle Log")
-                    for log in reversed(battle.battle_log[-8:]):
+                    for log in itertools.islice(reversed(battle.battle_log), 8):
                         st.text(f"> {log}")
 
+            # Fragment-scoped reruns skip the rest of the script, so any
+            # deferred save has to be flushed before the fragment returns
+            gm.flush_save()
+
         # 5v5 INTERFACE
-        elif mode == '5v5':
+        @st.fragment
+        def battle_5v5_view():
             st.subheader(f"Q{battle.quarter} - Team Battle")
-            
-            tc1, tc2 = st.columns(2)
-            with tc1: 
-                st.info("YOUR TEAM")
-                for u in battle.team1:
-                    if u.is_alive():
-                        render_health_bar(u.current_hp, u.max_hp, u.name)
+
+            # Snapshot both rosters in one pass; reused for the panels,
+            # the game-over check and the survivor counts below
+            status1 = battle.team_status(battle.team1)
+            status2 = battle.team_status(battle.team2)
+
+            def render_team_panel(status):
+                for name, hp, max_hp, alive, atk_b, def_b, labels in status:
+                    if alive:
+                        render_health_bar(hp, max_hp, name)
                         # Show buffs and labels inline
-                        status_parts = []
-                        if u.attack_buff_stacks != 0:
-                            status_parts.append(f"ATK:{u.attack_buff_stacks:+d}")
-                        if u.defense_buff_stacks != 0:
-                            status_parts.append(f"DEF:{u.defense_buff_stacks:+d}")
-                        if u.labels:
-                            status_parts.append(f"[{', '.join(u.labels)}]")
-                        if status_parts:
-                            st.caption(" | ".join(status_parts))
+                        status_text = unit_status_text(atk_b, def_b, tuple(labels))
+                        if status_text:
+                            st.caption(status_text)
                     else:
-                        st.markdown(f"~~{u.name}~~ 💀 **KO**")
+                        st.markdown(f"~~{name}~~ 💀 **KO**")
+
+            tc1, tc2 = st.columns(2)
+            with tc1:
+                st.info("YOUR TEAM")
+                render_team_panel(status1)
             with tc2:
                 st.error("OPPONENT")
-                for u in battle.team2:
-                    if u.is_alive():
-                        render_health_bar(u.current_hp, u.max_hp, u.name)
-                        # Show buffs inline
-                        status_parts = []
-                        if u.attack_buff_stacks != 0:
-                            status_parts.append(f"ATK:{u.attack_buff_stacks:+d}")
-                        if u.defense_buff_stacks != 0:
-                            status_parts.append(f"DEF:{u.defense_buff_stacks:+d}")
-                        if u.labels:
-                            status_parts.append(f"[{', '.join(u.labels)}]")
-                        if status_parts:
-                            st.caption(" | ".join(status_parts))
-                    else:
-                        st.markdown(f"~~{u.name}~~ 💀 **KO**")
-            
-            if not battle.team_alive(battle.team1) or not battle.team_alive(battle.team2) or battle.quarter > 4:
-                t1_alive = sum(1 for u in battle.team1 if u.is_alive())
-                t2_alive = sum(1 for u in battle.team2 if u.is_alive())
+                render_team_panel(status2)
+
+            t1_alive = sum(1 for s in status1 if s[3])
+            t2_alive = sum(1 for s in status2 if s[3])
+
+            if t1_alive == 0 or t2_alive == 0 or battle.quarter > 4:
                 
                 # Check Overtime Condition (Equal Survivors)
                 if t1_alive > 0 and t2_alive > 0 and t1_alive == t2_alive:
                     st.warning("⚡ OVERTIME! Sudden Death!")
-                    if st.button("BEGIN OVERTIME DUEL"):
+                    if st.button("BEGIN OVERTIME DUEL", key="begin_ot"):
                         # Get Champions (first living players)
                         p1 = next((u for u in battle.team1 if u.is_alive()), None)
                         p2 = next((u for u in battle.team2 if u.is_alive()), None)
@@ -913,7 +1083,7 @@ elif choice == 'battle':
                         if p1 and p2:
                             # Switch to 1v1 Mode but keep 5v5 tracking data
                             # We create a new 1v1 battle using the EXISTING units (preserving HP/Deck)
-                            st.session_state['active_battle'] = battle_engine.Battle(p1, p2)
+                            st.session_state['active_battle'] = battle_engine.Battle(p1, p2, verbose=False)
                             st.session_state['battle_mode'] = '1v1' 
                             # We keep 'battle_tracking' as 5v5 so rewards process correctly for the whole team
                             st.rerun()
@@ -923,33 +1093,14 @@ elif choice == 'battle':
                 else:
                     # Normal Win/Loss
                     user_won = t1_alive > t2_alive
+                    finalize_battle(user_won)
 
-                
                     if user_won:
                         st.success("🏆 TEAM VICTORY!")
-                        if 'reward_claimed' not in st.session_state:
-                            track = st.session_state['battle_tracking']
-                            state['tokens'] += config.TOKENS_WIN_5V5
-                            state['total_wins'] += 1
-                            for cid, tid in track['roster']:
-                                state['player_records'][cid]['wins'] += 1
-                                state['gametape_records'][tid]['wins'] += 1
-                                gm.check_retirement(tid, cid)
-                            gm.save_game()
-                            st.session_state['reward_claimed'] = True
                     else:
                         st.error("💀 TEAM DEFEAT")
-                        if 'reward_claimed' not in st.session_state:
-                            track = st.session_state['battle_tracking']
-                            state['tokens'] += config.TOKENS_LOSE_5V5
-                            for cid, tid in track['roster']:
-                                state['player_records'][cid]['losses'] += 1
-                                state['gametape_records'][tid]['losses'] += 1
-                                gm.check_retirement(tid, cid)
-                            gm.save_game()
-                            st.session_state['reward_claimed'] = True
-                            
-                    if st.button("Return to Arena"):
+
+                    if st.button("Return to Arena", key="return_5v5"):
                         st.session_state['active_battle'] = None
                         if 'reward_claimed' in st.session_state: del st.session_state['reward_claimed']
                         st.rerun()
@@ -960,33 +1111,40 @@ elif choice == 'battle':
                 if battle.quarter > 1:
                     st.caption(f"📋 Last Quarter Strategy: {battle.team1_strat['off']} / {battle.team1_strat['def']}")
 
-                sc1, sc2, sc3 = st.columns(3)
-                off_strat = sc1.selectbox("Offense", ["Feed the Hot Hand", "Ball Movement", "Crash the Glass", "7 Seconds or Less"])
-                def_strat = sc2.selectbox("Defense", ["Lockdown Paint", "Full Court Press", "Box Out", "Switch Everything"])
-                
-                if sc3.button("Simulate Quarter", type="primary"):
+                # Form batches the two selectboxes with the submit button so
+                # changing a strategy doesn't trigger a full script rerun
+                with st.form("coach_clipboard"):
+                    sc1, sc2, sc3 = st.columns(3)
+                    off_strat = sc1.selectbox("Offense", OFF_STRATS, key="coach_off")
+                    def_strat = sc2.selectbox("Defense", DEF_STRATS, key="coach_def")
+                    simulate = sc3.form_submit_button("Simulate Quarter", type="primary")
+
+                if simulate:
                     battle.team1_strat['off'] = off_strat
                     battle.team1_strat['def'] = def_strat
-                    opts_off = ["Feed the Hot Hand", "Ball Movement", "Crash the Glass", "7 Seconds or Less"]
-                    opts_def = ["Lockdown Paint", "Full Court Press", "Box Out", "Switch Everything"]
-                    battle.team2_strat['off'] = random.choice(opts_off)
-                    battle.team2_strat['def'] = random.choice(opts_def)
+                    battle.team2_strat['off'] = _RNG.choice(OFF_STRATS)
+                    battle.team2_strat['def'] = _RNG.choice(DEF_STRATS)
                     
-                    rounds = 12
-                    for _ in range(rounds):
-                        if not battle.team_alive(battle.team1) or not battle.team_alive(battle.team2): break
-                        for rank in range(5):
-                            if battle.rank_initiative[rank] == 1:
-                                battle.sim_lane_action(battle.team1, battle.team2, rank, 1, battle.team1_strat)
-                                battle.sim_lane_action(battle.team2, battle.team1, rank, 2, battle.team2_strat)
-                            else:
-                                battle.sim_lane_action(battle.team2, battle.team1, rank, 2, battle.team2_strat)
-                                battle.sim_lane_action(battle.team1, battle.team2, rank, 1, battle.team1_strat)
-                                
+                    battle.simulate_rounds()
+
                     if battle.team_alive(battle.team1) and battle.team_alive(battle.team2):
                         battle.quarter += 1
-                    st.rerun()
+                    # Settle rewards now unless regulation ended tied
+                    # (equal survivors head to the overtime duel instead)
+                    s1, s2 = battle.alive_count1, battle.alive_count2
+                    if s1 == 0 or s2 == 0 or battle.quarter > 4:
+                        if not (s1 > 0 and s2 > 0 and s1 == s2):
+                            finalize_battle(s1 > s2)
+                    st.rerun(scope="fragment")
                 
                 with st.expander("Game Log", expanded=True):
-                    for log in reversed(battle.battle_log[-24:]):
-                        st.text(log)
\ No newline at end of file
+                    for log in itertools.islice(reversed(battle.battle_log), 24):
+                        st.text(log)
+
+            gm.flush_save()
+
+        if mode == '1v1':
+            battle_1v1_view()
+        elif mode == '5v5':
+            battle_5v5_view()
+        gm.flush_save()
\ No newline at end of file
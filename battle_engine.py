@@ -3,11 +3,83 @@ Battle Engine
 Handles all combat mechanics, turn management, and battle resolution
 """
 
+import functools
 import random
-import math
-import copy
+from math import ceil as _ceil
+from collections import Counter, deque
 import game_config as config
 
+# Canonical action order shared by the deck dicts and the weight tables
+ACTIONS = ('attack', 'defensive_rebound', 'offensive_rebound',
+           'assist', 'steal', 'block')
+ACTION_IDX = {name: i for i, name in enumerate(ACTIONS)}
+
+# Label bit flags: one-time bitmask per unit replaces repeated O(n)
+# list membership scans in the combat hot paths
+LABEL_BITS = {
+    'Bruiser': 1,
+    'Stopper': 2,
+    'Microwave': 4,
+    'Floor General': 8,
+    'Rim Protector': 16,
+    'Triple Double': 32,
+}
+_BRUISER = LABEL_BITS['Bruiser']
+_STOPPER = LABEL_BITS['Stopper']
+_MICROWAVE = LABEL_BITS['Microwave']
+_FLOOR_GENERAL = LABEL_BITS['Floor General']
+_RIM_PROTECTOR = LABEL_BITS['Rim Protector']
+_TRIPLE_DOUBLE = LABEL_BITS['Triple Double']
+
+_UNIFORM_W = (1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+
+# Static strategy multipliers in ACTIONS order. Offense rows are keyed by
+# (strategy, context) where context means is-star for Feed the Hot Hand
+# and chain-built for Ball Movement; the other strategies ignore it.
+_OFF_WEIGHTS = {
+    ('Feed the Hot Hand', True): (5.0, 1.0, 0.5, 0.3, 1.0, 1.0),
+    ('Feed the Hot Hand', False): (0.3, 1.0, 1.0, 4.0, 1.0, 1.0),
+    ('Ball Movement', True): (4.0, 1.0, 1.0, 0.5, 1.0, 1.0),
+    ('Ball Movement', False): (0.2, 1.0, 1.0, 5.0, 1.0, 1.0),
+    ('Crash the Glass', True): (1.0, 1.0, 4.0, 1.0, 1.0, 1.0),
+    ('Crash the Glass', False): (1.0, 1.0, 4.0, 1.0, 1.0, 1.0),
+    ('7 Seconds or Less', True): (5.0, 0.3, 0.5, 0.3, 1.0, 1.0),
+    ('7 Seconds or Less', False): (5.0, 0.3, 0.5, 0.3, 1.0, 1.0),
+}
+_DEF_WEIGHTS = {
+    'Lockdown Paint': (1.0, 1.0, 1.0, 1.0, 1.0, 3.0),
+    'Full Court Press': (1.0, 1.0, 1.0, 1.0, 3.0, 1.0),
+    'Box Out': (1.0, 3.0, 1.0, 1.0, 1.0, 1.0),
+}
+
+# Stack decay over the practical buff range, tabulated once: every
+# attack and buff log line hits this instead of recomputing the
+# diminishing-returns curve
+_STACK_DECAY = [config.apply_stack_decay(s) for s in range(-10, 11)]
+
+def _decay(stacks):
+    if -10 <= stacks <= 10:
+        return _STACK_DECAY[stacks + 10]
+    return config.apply_stack_decay(stacks)
+
+@functools.lru_cache(maxsize=4096)
+def _damage(atk, defn, outcome):
+    """calculate_damage memoized on half-point-quantized stats.
+
+    The same matchup repeats constantly within a battle, and the 0.5
+    grid is far below anything visible in the damage numbers."""
+    return config.calculate_damage(atk, defn, outcome)
+
+def _damage_q(atk, defn, outcome):
+    return _damage(round(atk * 2) / 2, round(defn * 2) / 2, outcome)
+
+@functools.lru_cache(maxsize=64)
+def _combined_weights(off, context, defn):
+    """Offense x defense multiplier row, cached per strategy combo"""
+    ow = _OFF_WEIGHTS.get((off, context), _UNIFORM_W)
+    dw = _DEF_WEIGHTS.get(defn, _UNIFORM_W)
+    return tuple(o * d for o, d in zip(ow, dw))
+
 class BattleUnit:
     """Represents a player in battle with their stats and action deck"""
     
@@ -30,55 +102,41 @@ class BattleUnit:
             raw_moves = gametape['moves'] if isinstance(gametape['moves'], list) else []
             self.labels = []
             self.plus_minus = 0
+
+        # labels stays around for display; the flags drive combat checks
+        self.label_flags = 0
+        for label in self.labels:
+            self.label_flags |= LABEL_BITS.get(label, 0)
             
         # --- DECK BUILDING LOGIC ---
         self.timeouts_remaining = 2
-        self.action_deck = {
-            'attack': 0,
-            'defensive_rebound': 0,
-            'offensive_rebound': 0,
-            'assist': 0,
-            'steal': 0,
-            'block': 0
-        }
-        
-        # Track probability pools
-        self.attack_pool = [] # ['strong', 'weak', 'regular', 'miss']
+        # Deck counts live in a fixed-size list in ACTIONS order; string
+        # keys resolve through ACTION_IDX. Avoids dict hashing on every
+        # decrement/availability check in the battle loops.
+        self.action_deck = [0] * 6
+        
         self.total_actions_in_tape = len(raw_moves) if raw_moves else 1
         
-        tov_count = 0
-        foul_count = 0
+        # Single counting pass over the tape instead of branching per move
+        c = Counter(m['type'] for m in raw_moves)
         
-        for move in raw_moves:
-            m_type = move['type']
-            
-            # Categorize Moves
-            if m_type in ['attack', 'strong_attack', 'weak_attack', 'miss']:
-                self.action_deck['attack'] += 1
-                if m_type == 'attack': self.attack_pool.append('regular')
-                elif m_type == 'strong_attack': self.attack_pool.append('strong')
-                elif m_type == 'weak_attack': self.attack_pool.append('weak')
-                elif m_type == 'miss': self.attack_pool.append('miss')
-                
-            elif m_type == 'defensive_rebound':
-                self.action_deck['defensive_rebound'] += 1
-            elif m_type == 'offensive_rebound':
-                self.action_deck['offensive_rebound'] += 1
-            elif m_type == 'assist':
-                self.action_deck['assist'] += 1
-            elif m_type == 'steal':
-                self.action_deck['steal'] += 1
-            elif m_type == 'block':
-                self.action_deck['block'] += 1
-            elif m_type == 'turnover':
-                tov_count += 1
-            elif m_type in ['foul', 'technical', 'ejection']:
-                foul_count += 1
-                
-        self.tov_chance = tov_count / self.total_actions_in_tape
-        self.foul_chance = foul_count / self.total_actions_in_tape
+        self.action_deck[0] = c['attack'] + c['strong_attack'] + c['weak_attack'] + c['miss']
+        self.action_deck[1] = c['defensive_rebound']
+        self.action_deck[2] = c['offensive_rebound']
+        self.action_deck[3] = c['assist']
+        self.action_deck[4] = c['steal']
+        self.action_deck[5] = c['block']
+        
+        # Outcome pool as plain counts [regular, strong, weak, miss];
+        # the old string list only ever got counted, so the counts are
+        # the whole state
+        self.attack_counts = [c['attack'], c['strong_attack'],
+                              c['weak_attack'], c['miss']]
+        
+        self.tov_chance = c['turnover'] / self.total_actions_in_tape
+        self.foul_chance = (c['foul'] + c['technical'] + c['ejection']) / self.total_actions_in_tape
         
-        self.max_deck = self.action_deck.copy()
+        self.max_deck = list(self.action_deck)
         
         # Battle state
         self.current_hp = self.max_hp
@@ -93,14 +151,46 @@ class BattleUnit:
         # Update current_hp after potential Bruiser bonus
         self.current_hp = self.max_hp
 
+        # Per-event amounts that only depend on settled stats; computed
+        # once here so the battle loops skip the math
+        self.foul_recoil = self.max_hp * config.FOUL_DAMAGE
+        self.max_hp_ceil = _ceil(self.max_hp)
+        self.oreb_heal = self.max_hp * config.calculate_offensive_rebound_heal(self.rpg)
+        self.oreb_heal_5v5 = self.max_hp * 0.15
+
         # Power Rating
         self.power_rating = config.calculate_power_rating(
             self.max_hp, self.attack, self.defense, raw_moves
         )
-    
+
+        self.rebuild_attack_thresholds()
+
+    def rebuild_attack_thresholds(self):
+        """Cache cumulative outcome probabilities for sample_outcome.
+
+        Must be re-run whenever attack_counts is mutated (Stopper
+        effects add misses after construction)."""
+        regular, strong, weak, miss = self.attack_counts
+        n = regular + strong + weak + miss
+        if n == 0:
+            self._attack_cum = (0.0, 0.0, 1.0)
+            return
+        self._attack_cum = (strong / n, (strong + weak) / n,
+                            (strong + weak + regular) / n)
+
+    def sample_outcome(self):
+        """Draw an attack outcome via one uniform roll over the cached
+        thresholds instead of random.choice on the raw move list"""
+        r = random.random()
+        t = self._attack_cum
+        if r < t[0]: return 'strong'
+        if r < t[1]: return 'weak'
+        if r < t[2]: return 'regular'
+        return 'miss'
+
     def apply_label_stat_bonuses(self):
-        if 'Triple Double' in self.labels: self.defense *= 1.25
-        if 'Bruiser' in self.labels: self.max_hp += 30
+        if self.label_flags & _TRIPLE_DOUBLE: self.defense *= 1.25
+        if self.label_flags & _BRUISER: self.max_hp += 30
     
     def calculate_battle_stats(self, base_stats, gametape, season_stats):
         game_stats = gametape['game_stats']
@@ -137,27 +227,31 @@ class BattleUnit:
         return self.current_hp > 0.1
     
     def deck_is_empty(self):
-        return all(count == 0 for count in self.action_deck.values())
+        return not any(self.action_deck)
 
     def refill_deck(self, percentage):
-        for action, max_val in self.max_deck.items():
+        for i, max_val in enumerate(self.max_deck):
             if max_val > 0:
                 if percentage == 0.25: # Empty Reset
-                    self.action_deck[action] = math.ceil(max_val * percentage)
+                    self.action_deck[i] = _ceil(max_val * percentage)
                 else: # Timeout (Refill)
-                    used = max_val - self.action_deck[action]
-                    restore = math.ceil(used * 0.5)
-                    self.action_deck[action] = min(max_val, self.action_deck[action] + restore)
+                    used = max_val - self.action_deck[i]
+                    restore = _ceil(used * 0.5)
+                    self.action_deck[i] = min(max_val, self.action_deck[i] + restore)
 
 
 class Battle:
     """Manages an interactive 1v1 turn-based battle"""
     
-    def __init__(self, unit1, unit2):
+    def __init__(self, unit1, unit2, verbose=True):
         self.player = unit1
         self.opponent = unit2
         self.turn_count = 0
-        self.battle_log = []
+        self.battle_log = deque(maxlen=256)
+        # Console battles narrate to stdout; headless/UI callers pass
+        # verbose=False and read battle_log instead, skipping the
+        # per-message print cost in simulation loops
+        self.verbose = verbose
         
         # Apply Stopper label effects (adds misses to opponent)
         self.apply_stopper_effect(unit1, unit2)
@@ -172,12 +266,15 @@ class Battle:
 
     def apply_stopper_effect(self, stopper_unit, target_unit):
     # If stopper_unit has Stopper label, add 2 misses to target's attack pool #
-        if 'Stopper' in stopper_unit.labels:
-            target_unit.attack_pool.append('miss')
-            target_unit.attack_pool.append('miss')
+        if stopper_unit.label_flags & _STOPPER:
+            target_unit.attack_counts[3] += 2
+            target_unit.rebuild_attack_thresholds()
 
     def log(self, message):
-        print(message)
+        # stdout only in verbose (console) mode; the deque append stays
+        # unconditional because the Streamlit views render battle_log
+        if self.verbose:
+            print(message)
         self.battle_log.append(message)
 
     def execute_battle(self):
@@ -229,10 +326,11 @@ class Battle:
         return {'winner': winner, 'loser': loser, 'turns': self.turn_count}
 
     def display_status(self):
-        p_hp = math.ceil(self.player.current_hp)
-        o_hp = math.ceil(self.opponent.current_hp)
-        p_max = math.ceil(self.player.max_hp)
-        o_max = math.ceil(self.opponent.max_hp)
+        if not self.verbose: return
+        p_hp = _ceil(self.player.current_hp)
+        o_hp = _ceil(self.opponent.current_hp)
+        p_max = self.player.max_hp_ceil
+        o_max = self.opponent.max_hp_ceil
         print(f"\n[YOU] {self.player.name}: {p_hp}/{p_max} HP")
         print(f"[OPP] {self.opponent.name}: {o_hp}/{o_max} HP")
 
@@ -251,7 +349,7 @@ class Battle:
         
         valid_choices = []
         for idx, (key, label) in enumerate(options):
-            count = self.player.action_deck[key]
+            count = self.player.action_deck[idx]
             print(f"{idx+1}. {label} ({count} remaining)")
             if count > 0:
                 valid_choices.append(idx+1)
@@ -274,15 +372,15 @@ class Battle:
             self.execute_timeout(self.player)
         else:
             action_key = options[choice-1][0]
-            self.player.action_deck[action_key] -= 1
+            self.player.action_deck[choice-1] -= 1
             self.resolve_action(self.player, self.opponent, action_key)
 
     def opponent_turn_logic(self):
-        available = [k for k, v in self.opponent.action_deck.items() if v > 0]
+        available = [i for i, v in enumerate(self.opponent.action_deck) if v > 0]
         if not available: return
-        action_key = random.choice(available)
-        self.opponent.action_deck[action_key] -= 1
-        self.resolve_action(self.opponent, self.player, action_key)
+        idx = random.choice(available)
+        self.opponent.action_deck[idx] -= 1
+        self.resolve_action(self.opponent, self.player, ACTIONS[idx])
 
     def execute_timeout(self, unit):
         unit.timeouts_remaining -= 1
@@ -290,16 +388,19 @@ class Battle:
         self.log(f"🛑 {unit.name} calls Timeout! Actions partially restored.")
 
     def resolve_action(self, attacker, defender, action_type):
-        # Mistakes
-        if action_type in ['attack', 'assist']:
-            if random.random() < attacker.tov_chance:
+        # Mistakes: one roll covers both checks; for attacks the foul
+        # band sits directly above the turnover band on the same uniform
+        r = random.random() if action_type in ('attack', 'assist', 'steal', 'block') else 1.0
+        if action_type in ('attack', 'assist'):
+            if r < attacker.tov_chance:
                 attacker.skip_next_turn = True
                 self.log(f"⚠️ {attacker.name} commits a TURNOVER! Next turn skipped.")
                 return
+            r -= attacker.tov_chance
 
-        if action_type in ['attack', 'steal', 'block']:
-            if random.random() < attacker.foul_chance:
-                dmg = attacker.max_hp * config.FOUL_DAMAGE
+        if action_type in ('attack', 'steal', 'block'):
+            if r < attacker.foul_chance:
+                dmg = attacker.foul_recoil
                 attacker.current_hp = max(0, attacker.current_hp - dmg)
                 self.log(f"⚠️ {attacker.name} commits a FOUL! Takes {dmg:.1f} recoil damage.")
         
@@ -308,51 +409,49 @@ class Battle:
             self.resolve_attack(attacker, defender)
         elif action_type == 'defensive_rebound':
             attacker.defense_buff_stacks += 1
-            buff = config.apply_stack_decay(attacker.defense_buff_stacks)
+            buff = _decay(attacker.defense_buff_stacks)
             self.log(f"🛡️ {attacker.name} grabs Defensive Rebound! Defense buffed to {buff:.2f}x")
         elif action_type == 'offensive_rebound':
-            heal = attacker.max_hp * config.calculate_offensive_rebound_heal(attacker.rpg)
+            heal = attacker.oreb_heal
             attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal)
             self.log(f"🩹 {attacker.name} grabs Offensive Rebound! Heals {heal:.1f} HP")
         elif action_type == 'assist':
             stacks = 1
             # --- Floor General Bonus ---
-            if 'Floor General' in attacker.labels:
+            if attacker.label_flags & _FLOOR_GENERAL:
                 stacks = 2
                 self.log(f"🧠 {attacker.name}'s Floor General Bonus! +1 Extra Stack")
             attacker.attack_buff_stacks += stacks
-            buff = config.apply_stack_decay(attacker.attack_buff_stacks)
+            buff = _decay(attacker.attack_buff_stacks)
             self.log(f"🏀 {attacker.name} dishes an Assist! Next attack buffed to {buff:.2f}x")
         elif action_type == 'steal':
             defender.attack_buff_stacks -= 1
-            buff = config.apply_stack_decay(defender.attack_buff_stacks)
+            buff = _decay(defender.attack_buff_stacks)
             self.log(f"✋ {attacker.name} gets a Steal! {defender.name}'s attack lowered to {buff:.2f}.")
         elif action_type == 'block':
             # --- Rim Protector Bonus ---
             stacks = 1
-            if 'Rim Protector' in attacker.labels:
+            if attacker.label_flags & _RIM_PROTECTOR:
                 stacks = 2
                 self.log(f"🛡️ {attacker.name}'s Rim Protector Bonus! -1 Extra Def Stack") 
             defender.defense_buff_stacks -= stacks
-            buff = config.apply_stack_decay(defender.defense_buff_stacks)
+            buff = _decay(defender.defense_buff_stacks)
             self.log(f"🚫 {attacker.name} gets a Block! {defender.name}'s defense lowered to {buff:.2f}.")
 
     def resolve_attack(self, attacker, defender):
-        if not attacker.attack_pool:
-            outcome = 'regular'
-        else:
-            outcome = random.choice(attacker.attack_pool)
-            
+        outcome = attacker.sample_outcome()
+
+
         if outcome == 'miss':
             self.log(f"🧱 {attacker.name} shoots at {defender.name}... MISS! (0 Damage)")
             return
             
-        atk_val = attacker.attack * config.apply_stack_decay(attacker.attack_buff_stacks)
-        def_val = defender.defense * config.apply_stack_decay(defender.defense_buff_stacks)
+        atk_val = attacker.attack * _decay(attacker.attack_buff_stacks)
+        def_val = defender.defense * _decay(defender.defense_buff_stacks)
         
-        damage = config.calculate_damage(atk_val, def_val, outcome if outcome != 'regular' else 'regular')
+        damage = _damage_q(atk_val, def_val, outcome)
         
-        if 'Microwave' in attacker.labels and not attacker.microwave_used:
+        if attacker.label_flags & _MICROWAVE and not attacker.microwave_used:
             damage *= 2
             attacker.microwave_used = True
             self.log("🔥 {attacker.name}'s Microwave activated! Double Damage!")
@@ -375,11 +474,17 @@ class Battle5v5:
     - Simulation runs automatically based on strategy weights
     """
     
-    def __init__(self, team1_units, team2_units):
+    def __init__(self, team1_units, team2_units, verbose=True,
+                 auto=False, team1_strat_schedule=None):
+        self.verbose = verbose
+        # auto mode: no blocking input() calls, team1 strategies come
+        # from the optional per-quarter schedule (for scripted/batch runs)
+        self.auto = auto
+        self.team1_strat_schedule = team1_strat_schedule
         self.team1 = team1_units
         self.team2 = team2_units
         self.quarter = 1
-        self.battle_log = []
+        self.battle_log = deque(maxlen=256)
         
         self.team1_timeouts = 2
         self.team2_timeouts = 2
@@ -399,28 +504,53 @@ class Battle5v5:
             else:
                 self.rank_initiative.append(1)
 
+        # Flat lane ordering for one round, initiative resolved once
+        # here instead of per rank per round
+        self._round_schedule = tuple(
+            (rank, team_num)
+            for rank in range(5)
+            for team_num in ((1, 2) if self.rank_initiative[rank] == 1 else (2, 1))
+        )
+
         # Apply stopper label effects across teams
         self.apply_stopper_effects()
         # Strategy state tracking (for Ball Movement chain logic)
         self.team1_assist_chain = 0
         self.team2_assist_chain = 0
 
+        # Survivor lists, pruned on KO in resolve_attack_5v5 so liveness
+        # checks and spill-over targeting never rescan five units per
+        # lane action
+        self.alive1 = [u for u in self.team1 if u.is_alive()]
+        self.alive2 = [u for u in self.team2 if u.is_alive()]
+
+    @property
+    def alive_count1(self):
+        return len(self.alive1)
+
+    @property
+    def alive_count2(self):
+        return len(self.alive2)
+
     def apply_stopper_effects(self):
         # Apply Stopper label: each Stopper adds 2 misses to their lane opponent
         for i in range(5):
             if i < len(self.team1) and i < len(self.team2):
                 # Team1 stopper affects Team2 opponent
-                if 'Stopper' in self.team1[i].labels:
-                    self.team2[i].attack_pool.append('miss')
-                    self.team2[i].attack_pool.append('miss')
+                if self.team1[i].label_flags & _STOPPER:
+                    self.team2[i].attack_counts[3] += 2
+                    self.team2[i].rebuild_attack_thresholds()
                 # Team2 stopper affects Team1 opponent
-                if 'Stopper' in self.team2[i].labels:
-                    self.team1[i].attack_pool.append('miss')
-                    self.team1[i].attack_pool.append('miss')
+                if self.team2[i].label_flags & _STOPPER:
+                    self.team1[i].attack_counts[3] += 2
+                    self.team1[i].rebuild_attack_thresholds()
 
 
     def log(self, message):
-        print(message)
+        # stdout only in verbose (console) mode; the deque append stays
+        # unconditional because the Streamlit views render battle_log
+        if self.verbose:
+            print(message)
         self.battle_log.append(message)
 
     def execute_battle(self):
@@ -434,8 +564,8 @@ class Battle5v5:
                 self.quarter += 1
         
         # Check for OVERTIME trigger (Tied survivors)
-        t1_alive = sum(1 for u in self.team1 if u.is_alive())
-        t2_alive = sum(1 for u in self.team2 if u.is_alive())
+        t1_alive = self.alive_count1
+        t2_alive = self.alive_count2
         
         if t1_alive > 0 and t2_alive > 0 and t1_alive == t2_alive:
             self.log(f"\n⚡ REGULATION ENDED IN A DRAW! ({t1_alive} vs {t2_alive} survivors)")
@@ -460,17 +590,18 @@ class Battle5v5:
 
     def resolve_overtime(self):
         """Run a 1v1 battle with the first available players from each team"""
-        # Find champions (first living unit)
-        p1 = next((u for u in self.team1 if u.is_alive()), None)
-        p2 = next((u for u in self.team2 if u.is_alive()), None)
+        # Find champions (first living unit, straight off the survivor lists)
+        p1 = self.alive1[0] if self.alive1 else None
+        p2 = self.alive2[0] if self.alive2 else None
         
         if not p1 or not p2:
             # Fallback if logic fails (should be impossible due to check above)
             return {'winning_team': 1, 'survivors': 1}
             
         self.log(f"\n⚔️  OVERTIME DUEL: {p1.name} vs {p2.name} ⚔️")
-        self.log(f"HP: {math.ceil(p1.current_hp)} vs {math.ceil(p2.current_hp)}")
-        input("Press Enter to begin Overtime...")
+        self.log(f"HP: {_ceil(p1.current_hp)} vs {_ceil(p2.current_hp)}")
+        if not self.auto:
+            input("Press Enter to begin Overtime...")
         
         # Create interactive battle instance
         
@@ -489,26 +620,51 @@ class Battle5v5:
         self.choose_strategy()
         
         # 2. Simulation Loop (approx 12 rounds per quarter)
-        rounds_to_play = 12
-        
-        for r in range(rounds_to_play):
-            if not self.team_alive(self.team1) or not self.team_alive(self.team2): break
-            
+        self.simulate_rounds()
+
+    def simulate_rounds(self, rounds=12):
+        """Core quarter loop shared by the console and Streamlit front ends"""
+        # Local bindings: this loop body runs up to 60 times per quarter
+        # and each name below would otherwise be re-resolved per pass
+        team1, team2 = self.team1, self.team2
+        strat1, strat2 = self.team1_strat, self.team2_strat
+        lane = self.sim_lane_action
+
+        # Resolve the flat initiative schedule into ready argument
+        # tuples once per quarter; the round loop is then a straight
+        # walk with no per-lane dispatch
+        schedule = [
+            (team1, team2, rank, 1, strat1) if team_num == 1
+            else (team2, team1, rank, 2, strat2)
+            for rank, team_num in self._round_schedule
+        ]
+
+        for r in range(rounds):
+            if not self.alive1 or not self.alive2: break
+
             # self.log(f"--- Q{self.quarter} | Round {r+1} ---")
-            
-            for rank in range(5):
-                # Init check
-                if self.rank_initiative[rank] == 1:
-                    self.sim_lane_action(self.team1, self.team2, rank, 1, self.team1_strat)
-                    self.sim_lane_action(self.team2, self.team1, rank, 2, self.team2_strat)
-                else:
-                    self.sim_lane_action(self.team2, self.team1, rank, 2, self.team2_strat)
-                    self.sim_lane_action(self.team1, self.team2, rank, 1, self.team1_strat)
+
+            for args in schedule:
+                lane(*args)
+                # Stop as soon as a team is wiped instead of playing out
+                # the rest of the round
+                if not self.alive1 or not self.alive2:
+                    break
 
     def choose_strategy(self):
+        off_opts = ["Feed the Hot Hand", "Ball Movement", "Crash the Glass", "7 Seconds or Less"]
+        def_opts = ["Lockdown Paint", "Full Court Press", "Box Out", "Switch Everything"]
+
+        if self.auto:
+            schedule = self.team1_strat_schedule
+            if schedule and self.quarter - 1 < len(schedule):
+                self.team1_strat = schedule[self.quarter - 1]
+            self.team2_strat['off'] = random.choice(off_opts)
+            self.team2_strat['def'] = random.choice(def_opts)
+            return
+
         print("\n📋 COACH'S CLIPBOARD")
         print("Choose Offensive Strategy:")
-        off_opts = ["Feed the Hot Hand", "Ball Movement", "Crash the Glass", "7 Seconds or Less"]
         for i, o in enumerate(off_opts): print(f"{i+1}. {o}")
         
         try:
@@ -517,7 +673,6 @@ class Battle5v5:
         except: pass
         
         print("\nChoose Defensive Strategy:")
-        def_opts = ["Lockdown Paint", "Full Court Press", "Box Out", "Switch Everything"]
         for i, o in enumerate(def_opts): print(f"{i+1}. {o}")
         
         try:
@@ -545,15 +700,15 @@ class Battle5v5:
         action = self.weighted_action_choice(attacker, strat, atk_team, team_num)
         if not action: return # No valid moves
         
-        attacker.action_deck[action] -= 1
+        attacker.action_deck[ACTION_IDX[action]] -= 1
         
         # Target
         target = None
         if rank < len(def_team) and def_team[rank].is_alive():
             target = def_team[rank]
         else:
-            # Spill over
-            alive = [u for u in def_team if u.is_alive()]
+            # Spill over: pick straight from the maintained survivor list
+            alive = self.alive2 if team_num == 1 else self.alive1
             if alive: target = random.choice(alive)
             
         if not target and action != 'offensive_rebound': return
@@ -568,18 +723,18 @@ class Battle5v5:
                 self.team2_assist_chain = 0
             
         elif action == 'offensive_rebound':
-            allies = [u for u in atk_team if u.is_alive()]
+            allies = self.alive1 if team_num == 1 else self.alive2
             if allies:
                 # Heal most damaged
                 heal_target = min(allies, key=lambda x: x.current_hp/x.max_hp)
-                amt = heal_target.max_hp * 0.15
+                amt = heal_target.oreb_heal_5v5
                 heal_target.current_hp = min(heal_target.max_hp, heal_target.current_hp + amt)
                 self.log(f"T{team_num} {attacker.name} grabs O-REB! Heals {heal_target.name} (+{amt:.0f} HP)")
                 
         elif action == 'assist':
             stacks = 1
             # --- Floor General Bonus ---
-            if 'Floor General' in attacker.labels:
+            if attacker.label_flags & _FLOOR_GENERAL:
                 stacks = 2
                 # self.log(f"🧠 Floor General Bonus! +1 Extra Stack")
             # Synergy: Buff NEXT ally
@@ -589,14 +744,13 @@ class Battle5v5:
                 ally.attack_buff_stacks += stacks
                 self.log(f"T{team_num} {attacker.name} Assists -> Buffs {ally.name} (Atk +{ally.attack_buff_stacks} stacks)")
             else:
-                # If next is dead, find first alive
-                found = False
-                for i in range(5):
-                    if atk_team[i].is_alive() and i != rank:
-                        atk_team[i].attack_buff_stacks += 1
-                        self.log(f"T{team_num} {attacker.name} Assists -> Buffs {atk_team[i].name} (Atk +{atk_team[i].attack_buff_stacks} stacks)")
-                        found = True
-                        break
+                # If next is dead, pass to the next survivor after the
+                # attacker in the maintained alive list
+                allies = self.alive1 if team_num == 1 else self.alive2
+                if len(allies) > 1:
+                    fallback = allies[(allies.index(attacker) + 1) % len(allies)]
+                    fallback.attack_buff_stacks += 1
+                    self.log(f"T{team_num} {attacker.name} Assists -> Buffs {fallback.name} (Atk +{fallback.attack_buff_stacks} stacks)")
             
             # Track assist chain for Ball Movement strategy
             if team_num == 1:
@@ -612,7 +766,7 @@ class Battle5v5:
         elif action == 'block':
             # --- Rim Protector Bonus ---
             stacks = 1
-            if 'Rim Protector' in attacker.labels:
+            if attacker.label_flags & _RIM_PROTECTOR:
                 stacks = 2
                 # self.log(f"🧠 Rim Protector Bonus! +1 Extra Stack")
             target.defense_buff_stacks -= stacks
@@ -624,104 +778,98 @@ class Battle5v5:
 
     def weighted_action_choice(self, unit, strat, atk_team, team_num):
         """Pick action based on deck availability AND Strategy weights"""
-        available = [k for k, v in unit.action_deck.items() if v > 0]
-        if not available: return None
-        
-        weights = {k: 1.0 for k in available}
-        
+        deck = unit.action_deck
+        off = strat['off']
+
         # Get chain count for this team
         if team_num == 1:
             chain_count = self.team1_assist_chain
         else:
             chain_count = self.team2_assist_chain
-        
-        # Apply Offensive Strategy Weights
-        off = strat['off']
-        
+
+        # Fold the dynamic part of the strategy into the table context:
+        # star status (highest attack among the living) for Feed the Hot
+        # Hand, a built assist chain for Ball Movement
+        context = False
         if off == "Feed the Hot Hand":
-            # Identify star player (highest attack on team)
-            alive_teammates = [u for u in atk_team if u.is_alive()]
+            alive_teammates = self.alive1 if team_num == 1 else self.alive2
             if alive_teammates:
-                star = max(alive_teammates, key=lambda u: u.attack)
-                if unit == star:
-                    # Star: heavily favor attacking
-                    if 'attack' in weights: weights['attack'] *= 5.0
-                    # Suppress support actions for the star
-                    if 'assist' in weights: weights['assist'] *= 0.3
-                    if 'offensive_rebound' in weights: weights['offensive_rebound'] *= 0.5
-                else:
-                    # Role players: heavily favor assists to feed the star
-                    if 'assist' in weights: weights['assist'] *= 4.0
-                    # Suppress attacks for role players
-                    if 'attack' in weights: weights['attack'] *= 0.3
-                    
+                context = unit is max(alive_teammates, key=lambda u: u.attack)
         elif off == "Ball Movement":
-            # Chain assists before attacking
-            if chain_count < 2:
-                # Need more assists - suppress attacks until chain is built
-                if 'assist' in weights: weights['assist'] *= 5.0
-                if 'attack' in weights: weights['attack'] *= 0.2
-            else:
-                # Chain built - now favor attacks to cash in the buffs
-                if 'attack' in weights: weights['attack'] *= 4.0
-                if 'assist' in weights: weights['assist'] *= 0.5
-                
-        elif off == "Crash the Glass":
-            if 'offensive_rebound' in weights: weights['offensive_rebound'] *= 4.0
-            
-        elif off == "7 Seconds or Less":
-            # Aggressive: heavily favor attacks, suppress setup actions
-            if 'attack' in weights: weights['attack'] *= 5.0
-            if 'assist' in weights: weights['assist'] *= 0.3
-            if 'defensive_rebound' in weights: weights['defensive_rebound'] *= 0.3
-            if 'offensive_rebound' in weights: weights['offensive_rebound'] *= 0.5
-            
-        # Apply Defensive Strategy Weights
-        defn = strat['def']
-        if defn == "Lockdown Paint":
-            if 'block' in weights: weights['block'] *= 3.0
-        elif defn == "Full Court Press":
-            if 'steal' in weights: weights['steal'] *= 3.0
-        elif defn == "Box Out":
-            if 'defensive_rebound' in weights: weights['defensive_rebound'] *= 3.0
-            
-        # Select
-        try:
-            choices = list(weights.keys())
-            probs = list(weights.values())
-            return random.choices(choices, weights=probs, k=1)[0]
-        except:
-            return random.choice(available)
+            context = chain_count >= 2
+
+        weights = _combined_weights(off, context, strat['def'])
+
+        # One cumulative pass over the fixed action order, masking empty
+        # deck slots, then a single uniform roll: no per-call dict or
+        # list rebuilds and no random.choices machinery
+        total = 0.0
+        cum = [0.0] * 6
+        for i in range(6):
+            if deck[i] > 0:
+                total += weights[i]
+            cum[i] = total
+        if total <= 0.0:
+            return None
+
+        r = random.random() * total
+        for i, bound in enumerate(cum):
+            if r < bound:
+                return ACTIONS[i]
+        return None
 
     def resolve_attack_5v5(self, attacker, target, team_num):
-        pool = attacker.attack_pool if attacker.attack_pool else ['regular']
-        atype = random.choice(pool)
-        
+        atype = attacker.sample_outcome()
+
         if atype == 'miss':
             self.log(f"T{team_num} {attacker.name} misses shot on {target.name}.")
             return
             
-        atk = attacker.attack * config.apply_stack_decay(attacker.attack_buff_stacks)
-        defn = target.defense * config.apply_stack_decay(target.defense_buff_stacks)
-        dmg = config.calculate_damage(atk, defn, atype if atype != 'regular' else 'regular')
+        atk = attacker.attack * _decay(attacker.attack_buff_stacks)
+        defn = target.defense * _decay(target.defense_buff_stacks)
+        dmg = _damage_q(atk, defn, atype)
         
+        was_alive = target.is_alive()
         target.current_hp = max(0, target.current_hp - dmg)
         self.log(f"T{team_num} {attacker.name} scores on {target.name}! ({dmg:.0f} dmg)")
-        
+
+        if was_alive and not target.is_alive():
+            # Target is always on the defending team
+            if team_num == 1:
+                self.alive2.remove(target)
+            else:
+                self.alive1.remove(target)
+
         # Reset
         attacker.attack_buff_stacks = 0
         target.defense_buff_stacks = 0
 
     def team_alive(self, team):
-        return any(u.is_alive() for u in team)
+        # O(1) via the maintained survivor lists; fall back to a scan
+        # for foreign lists
+        if team is self.team1:
+            return bool(self.alive1)
+        if team is self.team2:
+            return bool(self.alive2)
+        return any(u.current_hp > 0 for u in team)
+
+    def team_status(self, team):
+        """One-pass snapshot of the render-facing unit fields.
+
+        Lets the UI draw health bars, buffs and KO markers from plain
+        tuples instead of hitting each unit's attributes repeatedly."""
+        return [(u.name, u.current_hp, u.max_hp, u.is_alive(),
+                 u.attack_buff_stacks, u.defense_buff_stacks, u.labels)
+                for u in team]
 
     def display_team_status(self):
+        if not self.verbose: return
         print("\n--- TEAM STATUS ---")
         print("YOUR TEAM:")
         for u in self.team1:
-            status = f"{math.ceil(u.current_hp)}/{math.ceil(u.max_hp)} HP" if u.is_alive() else "OUT"
+            status = f"{_ceil(u.current_hp)}/{u.max_hp_ceil} HP" if u.is_alive() else "OUT"
             print(f"  {u.name}: {status}")
         print("OPPONENT TEAM:")
         for u in self.team2:
-            status = f"{math.ceil(u.current_hp)}/{math.ceil(u.max_hp)} HP" if u.is_alive() else "OUT"
+            status = f"{_ceil(u.current_hp)}/{u.max_hp_ceil} HP" if u.is_alive() else "OUT"
             print(f"  {u.name}: {status}")
\ No newline at end of file
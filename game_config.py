@@ -3,6 +3,8 @@ NBA Stat Attack Configuration
 Contains all game formulas, constants, and settings
 """
 
+from collections import Counter
+
 # Base stats for all players
 BASE_HP = 100
 BASE_ATTACK = 10
@@ -80,37 +82,92 @@ def calculate_base_stats(player_stats):
         'defense': max(5, defense)  # Minimum 5 defense
     }
 
+def calculate_base_stats_batch(stats):
+    """
+    Vectorized calculate_base_stats for whole-roster/league inputs
+    stats maps PTS/AST/TOV/REB/STL/BLK/MIN to aligned arrays (or is a
+    DataFrame with those columns); returns arrays of hp/attack/defense
+    """
+    # Imported here so the pure-scalar game paths don't pay for NumPy
+    import numpy as np
+
+    attack = BASE_ATTACK + (stats['PTS'] * PPG_TO_ATTACK) \
+                         + (stats['AST'] * APG_TO_ATTACK) \
+                         + (stats['TOV'] * TOV_TO_ATTACK)
+    defense = BASE_DEFENSE + (stats['REB'] * RPG_TO_DEFENSE) \
+                           + (stats['STL'] * SPG_TO_DEFENSE) \
+                           + (stats['BLK'] * BPG_TO_DEFENSE)
+    hp = BASE_HP + ((stats['MIN'] - AVERAGE_MPG) * MPG_TO_HP)
+
+    return {
+        'hp': np.maximum(50, hp),  # Minimum 50 HP
+        'attack': np.maximum(5, attack),  # Minimum 5 attack
+        'defense': np.maximum(5, defense)  # Minimum 5 defense
+    }
+
 def calculate_deviation_multiplier(game_value, season_average):
     """
     Calculate buff/debuff multiplier based on deviation from season average
     """
-    if season_average == 0:
-        season_average = 0.1  # Avoid division by zero
-    
-    multiplier = 0.5 + (game_value / season_average) * 0.5
-    return max(0.5, min(2.0, multiplier))  # Cap between 0.5x and 2.0x
+    denom = season_average if season_average else 0.1  # Avoid division by zero
+    return max(0.5, min(2.0, 0.5 + (game_value / denom) * 0.5))  # Cap between 0.5x and 2.0x
+
+def calculate_deviation_multiplier_batch(game_values, season_averages):
+    """
+    Vectorized calculate_deviation_multiplier over aligned stat arrays
+    """
+    # Imported here so the pure-scalar game paths don't pay for NumPy
+    import numpy as np
+
+    denom = np.where(season_averages == 0, 0.1, season_averages)
+    return np.clip(0.5 + (game_values / denom) * 0.5, 0.5, 2.0)
+
+def _specialize_damage(type_mult):
+    """
+    Bake one attack-type multiplier into a closed-over damage function
+    """
+    scale = 1.8 * type_mult
+    def calc(attack, defense):
+        # Significantly reduced damage formula
+        return max(1, int((attack * attack / (attack + defense)) * scale))  # Minimum 1 damage
+    return calc
+
+# One specialized function per attack type, built at import so the
+# per-call path has no multiplier lookup or extra multiply
+_DAMAGE_FUNCS = {
+    'weak': _specialize_damage(WEAK_ATTACK_MULTIPLIER),
+    'regular': _specialize_damage(REGULAR_ATTACK_MULTIPLIER),
+    'strong': _specialize_damage(STRONG_ATTACK_MULTIPLIER)
+}
+_DAMAGE_REGULAR = _DAMAGE_FUNCS['regular']
 
 def calculate_damage(attack, defense, attack_type='regular'):
     """
     Calculate damage dealt based on attack vs defense
     """
-    multipliers = {
-        'weak': WEAK_ATTACK_MULTIPLIER,
-        'regular': REGULAR_ATTACK_MULTIPLIER,
-        'strong': STRONG_ATTACK_MULTIPLIER
-    }
-    
-    type_mult = multipliers.get(attack_type, REGULAR_ATTACK_MULTIPLIER)
-    
-    # Significantly reduced damage formula
-    base_damage = (attack ** 2 / (attack + defense)) * 1.8
-    final_damage = base_damage * type_mult
-    
-    return max(1, int(final_damage))  # Minimum 1 damage
+    return _DAMAGE_FUNCS.get(attack_type, _DAMAGE_REGULAR)(attack, defense)
 
-def apply_stack_decay(stack_count):
+def calculate_damage_batch(attack, defense, type_idx):
+    """
+    Vectorized calculate_damage for matchup tables and batch simulations
+    attack/defense are broadcastable NumPy arrays (e.g. (N,1) vs (1,M));
+    type_idx indexes 0=weak, 1=regular, 2=strong
+    """
+    # Imported here so the pure-scalar game paths don't pay for NumPy
+    import numpy as np
+
+    mults = np.array([WEAK_ATTACK_MULTIPLIER,
+                      REGULAR_ATTACK_MULTIPLIER,
+                      STRONG_ATTACK_MULTIPLIER])
+
+    base_damage = (attack * attack / (attack + defense)) * 1.8
+    final_damage = base_damage * mults[type_idx]
+
+    return np.maximum(1, final_damage.astype(np.int32))  # Minimum 1 damage
+
+def _stack_decay_value(stack_count):
     """
-    Apply diminishing returns to stacked buffs/debuffs
+    Diminishing-returns curve for stacked buffs/debuffs
     """
     if stack_count == 0:
         return 1.0
@@ -131,6 +188,21 @@ def apply_stack_decay(stack_count):
         # Example: Magnitude 0.1 -> 1.1 (10% boost)
         return 1.0 + magnitude
 
+# Tabulated once at import; stack counts are small bounded ints so the
+# hot lookup replaces a float power per call
+_STACK_DECAY_TABLE = [_stack_decay_value(c) for c in range(-20, 21)]
+
+def apply_stack_decay(stack_count):
+    """
+    Apply diminishing returns to stacked buffs/debuffs (table lookup,
+    clamped to the practical +/-20 stack range)
+    """
+    if stack_count < -20:
+        stack_count = -20
+    elif stack_count > 20:
+        stack_count = 20
+    return _STACK_DECAY_TABLE[stack_count + 20]
+
 
 def calculate_offensive_rebound_heal(rpg):
     """
@@ -143,13 +215,14 @@ def calculate_power_rating(hp, attack, defense, moves):
     """
     Calculate a simple power rating for quick comparison
     """
-    # Count move types
-    strong_attacks = sum(1 for m in moves if m['type'] == 'strong_attack')
-    regular_attacks = sum(1 for m in moves if m['type'] == 'attack')
-    weak_attacks = sum(1 for m in moves if m['type'] == 'weak_attack')
-    buffs = sum(1 for m in moves if m['type'] in ['assist', 'defensive_rebound'])
-    misses = sum(1 for m in moves if m['type'] == 'miss')
-    turnovers = sum(1 for m in moves if m['type'] == 'turnover')
+    # Count move types in one pass
+    counts = Counter(m['type'] for m in moves)
+    strong_attacks = counts['strong_attack']
+    regular_attacks = counts['attack']
+    weak_attacks = counts['weak_attack']
+    buffs = counts['assist'] + counts['defensive_rebound']
+    misses = counts['miss']
+    turnovers = counts['turnover']
     
     move_quality = (strong_attacks * 3) + (regular_attacks * 2) + (weak_attacks * 1) + \
                    (buffs * 2) - (misses * 0.5) - (turnovers * 3)
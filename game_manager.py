@@ -6,30 +6,55 @@ Handles user inventory, token economy, and overall game progression
 import json
 import os
 import random
+import re
+from collections import Counter
 from datetime import datetime
 import game_config as config
 import nba_data
 import battle_engine
 
+# Optional: present in the web app, absent for the console game
+try:
+    import streamlit as st
+    _HAS_ST = True
+except ImportError:
+    _HAS_ST = False
+
 class GameManager:
-    def __init__(self):
-        self.nba_manager = nba_data.NBADataManager()
+    def __init__(self, nba_manager=None):
+        # The data manager (SQLite connection + query cache) is a shared
+        # read-only resource; callers can inject a process-wide instance
+        self.nba_manager = nba_manager or nba_data.NBADataManager()
         self.save_file = 'game_save.json'
+        self._dirty = False
+        # Display names are immutable; cache them so roster/sell/battle
+        # menus don't repeat the SQLite lookup per render
+        self._name_cache = {}
+        # Per-(player, season) game_id -> row indexes for O(1) tape
+        # resolution instead of scanning the full game-log list
+        self._game_index = {}
+        # Validated-games lists per (player, season) so tape purchases
+        # sample from known-good candidates instead of rejection loops
+        self._valid_games_cache = {}
         
         self.game_state = {
             'tokens': 0,
             'total_wins': 0,
             # Card ID format: "PLAYERID_SEASON" (e.g., "2544_2016-17")
             'player_cards': [],  
-            'player_records': {},  
-            'gametapes': {},  
-            'gametape_records': {},  
-            'gametape_metadata': {}, 
+            'player_records': {},
+            'gametapes': {},
+            # Consolidated per-tape table: {tid: {'wins', 'losses', 'name'}}.
+            # Replaces the old parallel gametape_records/gametape_metadata
+            # dicts so tape renders do one lookup instead of three.
+            'tapes': {},
             'hall_of_fame': [],
             'created_date': datetime.now().isoformat()
         }
         
         if self.load_game():
+            self.migrate_save_schema()
+            self._prefetch_player_names()
             self.verify_and_repair_save()
         else:
             self.new_game()
@@ -37,14 +62,69 @@ class GameManager:
     # --- HELPERS ---
     def parse_card_id(self, card_id):
         """Extract player_id and season from composite ID"""
+        pid_str, sep, season = card_id.partition('_')
+        if not sep: return None, None
         try:
-            parts = card_id.split('_')
-            return int(parts[0]), parts[1]
-        except:
+            return int(pid_str), season
+        except ValueError:
             return None, None
 
+    def _prefetch_player_names(self):
+        """Warm the name cache with one IN-query over the roster"""
+        pids = {}
+        for card_id in self.game_state['player_cards']:
+            pid, season = self.parse_card_id(card_id)
+            if pid: pids.setdefault(pid, []).append((card_id, season))
+        if not pids: return
+
+        try:
+            cursor = self.nba_manager.conn.cursor()
+            cursor.execute(
+                f"SELECT id, full_name FROM players WHERE id IN ({','.join('?' * len(pids))})",
+                tuple(pids))
+            names = {row['id']: row['full_name'] for row in cursor.fetchall()}
+        except:
+            return
+
+        for pid, cards in pids.items():
+            name = names.get(pid, f"Player {pid}")
+            for card_id, season in cards:
+                self._name_cache[card_id] = f"{name} ({season})"
+
+    def _valid_games(self, pid, season):
+        """Games whose tapes pass validation, computed once per (player, season)"""
+        key = (pid, season)
+        cached = self._valid_games_cache.get(key)
+        if cached is None:
+            cached = []
+            for g in self.nba_manager.get_player_games(pid, season):
+                m = self.nba_manager.get_game_moves(pid, g['game_id'], calculate_labels=False)
+                if self.nba_manager.validate_gametape(m, g)[0]:
+                    cached.append(g)
+            self._valid_games_cache[key] = cached
+        return cached
+
+    def _find_game(self, pid, season, game_id):
+        """Look up one game row via a cached game_id index"""
+        key = (pid, season)
+        idx = self._game_index.get(key)
+        if idx is None:
+            games = self.nba_manager.get_player_games(pid, season)
+            idx = {str(g['game_id']): g for g in games}
+            self._game_index[key] = idx
+        return idx.get(str(game_id))
+
+    def parse_tape_id(self, tape_id):
+        """Extract player_id and game_id strings from composite tape ID"""
+        pid_str, sep, game_id = tape_id.partition('_')
+        if not sep: return None, None
+        return pid_str, game_id
+
     def get_player_name(self, card_id):
         """Get display name including season"""
+        cached = self._name_cache.get(card_id)
+        if cached: return cached
+
         pid, season = self.parse_card_id(card_id)
         if not pid: return "Unknown"
         
@@ -53,15 +133,17 @@ class GameManager:
             cursor.execute("SELECT full_name FROM players WHERE id=?", (pid,))
             row = cursor.fetchone()
             name = row['full_name'] if row else f"Player {pid}"
-            return f"{name} ({season})"
+            display = f"{name} ({season})"
         except:
-            return f"Player {pid} ({season})"
+            display = f"Player {pid} ({season})"
+        self._name_cache[card_id] = display
+        return display
 
     # --- SAVE SYSTEM ---
     def load_game(self):
         """Load game from session state (browser-based, per-user)"""
+        if not _HAS_ST: return False
         try:
-            import streamlit as st
             if 'saved_game_data' in st.session_state:
                 self.game_state.update(st.session_state['saved_game_data'])
                 return True
@@ -70,39 +152,85 @@ class GameManager:
             return False
 
     def save_game(self):
-        """Save game to session state (browser-based, per-user)"""
+        """Save game to session state (browser-based, per-user)
+
+        Stores the live game_state reference: the manager is the only
+        writer and load_game pulls the same dict back on the next
+        session, so snapshotting it bought nothing. Keep it on the
+        script thread: Streamlit session_state must not be touched from
+        background threads.
+        """
+        if not _HAS_ST: return
         try:
-            import streamlit as st
-            st.session_state['saved_game_data'] = self.game_state.copy()
+            # Version counter lets the UI cache derived artifacts (e.g. the
+            # download-button JSON) and invalidate only on real changes
+            self.game_state['_version'] = self.game_state.get('_version', 0) + 1
+            st.session_state['saved_game_data'] = self.game_state
         except Exception:
             pass
 
+    def mark_dirty(self):
+        """Defer the save: note that game_state changed without copying it.
+
+        UI handlers that mutate state several times in one rerun can mark
+        and let flush_save coalesce everything into a single snapshot."""
+        self._dirty = True
+
+    def flush_save(self):
+        """Snapshot game_state if anything was marked dirty this rerun"""
+        if self._dirty:
+            self._dirty = False
+            self.save_game()
+
+    def migrate_save_schema(self):
+        """Fold legacy gametape_records/gametape_metadata into 'tapes'"""
+        records = self.game_state.pop('gametape_records', None)
+        metadata = self.game_state.pop('gametape_metadata', None)
+        if records is None and metadata is None:
+            return
+
+        tapes = self.game_state.setdefault('tapes', {})
+        for tid, rec in (records or {}).items():
+            entry = tapes.setdefault(tid, {'wins': 0, 'losses': 0, 'name': tid})
+            entry['wins'] = rec.get('wins', 0)
+            entry['losses'] = rec.get('losses', 0)
+        for tid, name in (metadata or {}).items():
+            tapes.setdefault(tid, {'wins': 0, 'losses': 0, 'name': tid})['name'] = name
+        self.save_game()
+
     def verify_and_repair_save(self):
         """Repair metadata for tapes"""
-        # print("Verifying save data integrity...") 
-        dirty = False
-        
+        # print("Verifying save data integrity...")
+        tape_table = self.game_state.setdefault('tapes', {})
+
+        # Common case after the first save: every tape is named, so find
+        # the broken entries before touching the database at all
+        broken = []
         for card_id, tapes in self.game_state['gametapes'].items():
+            for tape_id in tapes:
+                entry = tape_table.get(tape_id)
+                if not entry or not entry.get('name') or entry['name'] == tape_id:
+                    broken.append((card_id, tape_id))
+        if not broken:
+            return
+
+        dirty = False
+        for card_id, tape_id in broken:
             pid, season = self.parse_card_id(card_id)
             if not pid: continue
-            
-            for tape_id in tapes:
-                if tape_id not in self.game_state.get('gametape_metadata', {}):
-                    try:
-                        # Regenerate name
-                        game_id = tape_id.split('_')[1]
-                        games = self.nba_manager.get_player_games(pid, season)
-                        stats = self.nba_manager.get_player_season_stats(pid, season)
-                        
-                        target_game = next((g for g in games if str(g['game_id']) == str(game_id)), None)
-                        
-                        if target_game and stats:
-                            labels = self.nba_manager.detect_gametape_labels_offline(pid, game_id, target_game)
-                            name = self.create_gametape_display_name(target_game, stats, labels)
-                            self.game_state['gametape_metadata'][tape_id] = name
-                            dirty = True
-                    except:
-                        pass
+            try:
+                # Regenerate name
+                game_id = self.parse_tape_id(tape_id)[1]
+                stats = self.nba_manager.get_player_season_stats(pid, season)
+                target_game = self._find_game(pid, season, game_id)
+                
+                if target_game and stats:
+                    labels = self.nba_manager.detect_gametape_labels_offline(pid, game_id, target_game)
+                    name = self.create_gametape_display_name(target_game, stats, labels)
+                    tape_table.setdefault(tape_id, {'wins': 0, 'losses': 0})['name'] = name
+                    dirty = True
+            except:
+                pass
         if dirty:
             self.save_game()
 
@@ -120,9 +248,18 @@ class GameManager:
         print("\nSelecting starter...")
         pool = self.nba_manager.get_available_card_pool()
         
-        valid_starters = random.sample(pool, min(50, len(pool)))
-        
-        for candidate in valid_starters:
+        # Draw candidates lazily: the first valid one wins, so there is
+        # no point materializing a 50-wide sample of the whole pool
+        def draw_candidates(limit=50):
+            tried = set()
+            limit = min(limit, len(pool))
+            while len(tried) < limit:
+                idx = random.randrange(len(pool))
+                if idx in tried: continue
+                tried.add(idx)
+                yield pool[idx]
+        
+        for candidate in draw_candidates():
             pid = candidate['id']
             season = candidate['season']
             
@@ -134,33 +271,36 @@ class GameManager:
             
             # Find valid tape
             for game in games[:5]:
-                # Calculate labels here to include in name immediately
-                moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=True)
+                moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=False)
                 valid, _ = self.nba_manager.validate_gametape(moves_data, game)
                 if valid:
-                    # Found one!
+                    # Found one! Labels only for the accepted tape,
+                    # so rejected candidates never pay for them
+                    moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=True)
                     card_id = f"{pid}_{season}"
                     tape_id = f"{pid}_{game['game_id']}"
                     
                     self.game_state['player_cards'].append(card_id)
                     self.game_state['gametapes'][card_id] = [tape_id]
                     self.game_state['player_records'][card_id] = {'wins': 0, 'losses': 0}
-                    self.game_state['gametape_records'][tape_id] = {'wins': 0, 'losses': 0}
-                    
-                    # Metadata with labels
+
+                    # Tape entry with labels in the display name
                     name = self.create_gametape_display_name(game, stats, moves_data.get('labels', []))
-                    self.game_state['gametape_metadata'][tape_id] = name
+                    self.game_state['tapes'][tape_id] = {'wins': 0, 'losses': 0, 'name': name}
                     
                     print(f"🎉 Starter: {candidate['full_name']} ({season})")
                     print(f"Tape: {name}")
                     return
 
     # --- CORE LOGIC ---
+    _DATE_TRANS = str.maketrans('', '', '-')
+    _MATCHUP_RE = re.compile(r' @ | vs\. ')
+
     def create_gametape_display_name(self, game_stats, season_stats, labels):
         """Format: YYYYMMDD_Matchup_Stats_Labels"""
         date_str = game_stats.get('date', game_stats.get('game_date', '0000-00-00'))
-        fmt_date = date_str.replace('-', '')
-        matchup = game_stats['matchup'].replace(' @ ', 'vs').replace(' vs. ', 'vs')
+        fmt_date = date_str.translate(self._DATE_TRANS)
+        matchup = self._MATCHUP_RE.sub('vs', game_stats['matchup'])
         
         # Add labels to display string
         label_str = ""
@@ -178,12 +318,10 @@ class GameManager:
         if not season_stats: return None
         
         # 2. Get Game Stats
-        try:
-            game_id = tape_id.split('_')[1]
-        except: return None
+        game_id = self.parse_tape_id(tape_id)[1]
+        if game_id is None: return None
         
-        games = self.nba_manager.get_player_games(pid, season)
-        game_stats = next((g for g in games if str(g['game_id']) == str(game_id)), None)
+        game_stats = self._find_game(pid, season, game_id)
         if not game_stats: return None
         
         # 3. Get Moves & Labels
@@ -201,11 +339,14 @@ class GameManager:
             'moves': moves_data
         }
         unit = battle_engine.BattleUnit(player_card_mock, gametape, season_stats)
-    
+
         # Attach extra attributes for UI access
         unit.season_stats = season_stats
         unit.gametape = gametape
-        
+        # Precompute once; the battle UI shows this every rerun
+        unit.tape_display_name = self.create_gametape_display_name(
+            game_stats, season_stats, unit.labels)
+
         return unit
 
 
@@ -218,30 +359,29 @@ class GameManager:
         if not games:
             return False, "No games found for this player."
             
-        for _ in range(20):
-            g = random.choice(games)
-            tid = f"{pid}_{g['game_id']}"
-            
-            if tid in self.game_state['gametapes'].get(card_id, []):
-                continue
-            
-            m = self.nba_manager.get_game_moves(pid, g['game_id'], calculate_labels=True)
-            if self.nba_manager.validate_gametape(m, g)[0]:
-                # Purchase
-                self.game_state['tokens'] -= config.GAMETAPE_COST
-                if card_id not in self.game_state['gametapes']:
-                    self.game_state['gametapes'][card_id] = []
-                self.game_state['gametapes'][card_id].append(tid)
-                self.game_state['gametape_records'][tid] = {'wins': 0, 'losses': 0}
-                
-                stats = self.nba_manager.get_player_season_stats(pid, season)
-                tname = self.create_gametape_display_name(g, stats, m.get('labels', []))
-                self.game_state['gametape_metadata'][tid] = tname
-                
-                self.save_game()
-                return True, tname
-                
-        return False, "Could not find a valid new gametape."
+        owned = set(self.game_state['gametapes'].get(card_id, []))
+        candidates = [g for g in self._valid_games(pid, season)
+                      if f"{pid}_{g['game_id']}" not in owned]
+        if not candidates:
+            return False, "Could not find a valid new gametape."
+
+        g = random.choice(candidates)
+        tid = f"{pid}_{g['game_id']}"
+        # Labels only for the tape actually bought
+        m = self.nba_manager.get_game_moves(pid, g['game_id'], calculate_labels=True)
+
+        # Purchase
+        self.game_state['tokens'] -= config.GAMETAPE_COST
+        if card_id not in self.game_state['gametapes']:
+            self.game_state['gametapes'][card_id] = []
+        self.game_state['gametapes'][card_id].append(tid)
+
+        stats = self.nba_manager.get_player_season_stats(pid, season)
+        tname = self.create_gametape_display_name(g, stats, m.get('labels', []))
+        self.game_state['tapes'][tid] = {'wins': 0, 'losses': 0, 'name': tname}
+        
+        self.save_game()
+        return True, tname
 
     # --- MENUS (Legacy Console Support) ---
     def battle_menu(self):
@@ -249,8 +389,7 @@ class GameManager:
         print("1. Quick Battle (1v1)")
         
         wins = self.game_state['total_wins']
-        valid_roster_count = sum(1 for cid in self.game_state['player_cards'] 
-                               if len(self.game_state['gametapes'].get(cid, [])) > 0)
+        valid_roster_count = len(self.get_valid_roster())
         
         can_5v5 = (wins >= config.GAMES_TO_UNLOCK_5V5) and (valid_roster_count >= 5)
         reason = ""
@@ -282,7 +421,7 @@ class GameManager:
         
         print("\nSelect Gametape:")
         for i, tid in enumerate(tapes):
-            rec = self.game_state['gametape_records'].get(tid, {'wins':0, 'losses':0})
+            rec = self.game_state['tapes'].get(tid, {'wins':0, 'losses':0})
             meta = self.get_display_name(tid)
             print(f"{i+1}. {meta} [W{rec['wins']}-L{rec['losses']}]")
             
@@ -296,11 +435,7 @@ class GameManager:
         o_unit = self.generate_random_opponent()
         if not o_unit: print("Error generating opponent"); return
         
-        o_tape_name = self.create_gametape_display_name(
-            o_unit.gametape['game_stats'], 
-            o_unit.season_stats, 
-            o_unit.labels
-        )
+        o_tape_name = o_unit.tape_display_name
         print("\n" + "="*40)
         print("TALE OF THE TAPE")
         print(f"YOU: {p_unit.name}")
@@ -317,17 +452,18 @@ class GameManager:
         self.handle_battle_result(res, p_unit, tape_id, card_id)
 
     def team_battle(self):
-        valid_roster = [cid for cid in self.game_state['player_cards'] 
-                        if self.game_state['gametapes'].get(cid)]
+        # Computed once; the roster can't change mid-selection
+        valid_roster = self.get_valid_roster()
         
         team_units = []
         selected_info = [] 
+        selected_cids = set()
         
         print("\nSelect 5 Players for your Lineup:")
         for slot in range(5):
             print(f"\nSlot {slot+1}:")
             for i, cid in enumerate(valid_roster):
-                if cid in [x[0] for x in selected_info]: continue 
+                if cid in selected_cids: continue 
                 print(f"{i+1}. {self.get_player_name(cid)}")
             
             c_idx = config.get_valid_input("Select Player: ", len(valid_roster)) - 1
@@ -343,10 +479,10 @@ class GameManager:
             if unit:
                 team_units.append(unit)
                 selected_info.append((cid, tid))
+                selected_cids.add(cid)
         
         print("\nGenerating Opponent Team...")
-        opp_units = [self.generate_random_opponent() for _ in range(5)]
-        opp_units = [u for u in opp_units if u]
+        opp_units = self.generate_random_opponents(5)
         if len(opp_units) < 5: print("Error gen opponents"); return
         
         print("\n" + "="*40)
@@ -368,13 +504,13 @@ class GameManager:
             self.game_state['total_wins'] += 1
             for cid, tid in selected_info:
                 self.game_state['player_records'][cid]['wins'] += 1
-                self.game_state['gametape_records'][tid]['wins'] += 1
+                self.game_state['tapes'][tid]['wins'] += 1
         else:
             print("\n💀 DEFEAT")
             self.game_state['tokens'] += config.TOKENS_LOSE_5V5
             for cid, tid in selected_info:
                 self.game_state['player_records'][cid]['losses'] += 1
-                self.game_state['gametape_records'][tid]['losses'] += 1
+                self.game_state['tapes'][tid]['losses'] += 1
         
         for cid, tid in selected_info:
             self.check_retirement(tid, cid)
@@ -388,21 +524,26 @@ class GameManager:
             self.game_state['tokens'] += config.TOKENS_WIN_1V1
             self.game_state['total_wins'] += 1
             self.game_state['player_records'][card_id]['wins'] += 1
-            self.game_state['gametape_records'][tape_id]['wins'] += 1
+            self.game_state['tapes'][tape_id]['wins'] += 1
         else:
             print("\n💀 DEFEAT")
             self.game_state['tokens'] += config.TOKENS_LOSE_1V1
             self.game_state['player_records'][card_id]['losses'] += 1
-            self.game_state['gametape_records'][tape_id]['losses'] += 1
+            self.game_state['tapes'][tape_id]['losses'] += 1
             
         self.check_retirement(tape_id, card_id)
         self.save_game()
         input("Press Enter...")
 
     def check_retirement(self, tape_id, card_id):
-        rec = self.game_state['gametape_records'][tape_id]
+        rec = self.game_state['tapes'][tape_id]
+        # Fast path: most battles end well short of either threshold, so
+        # skip the name/display lookups unless a retirement triggers
+        if rec['wins'] < config.GAMETAPE_MAX_WINS and rec['losses'] < config.GAMETAPE_MAX_LOSSES:
+            return
+
         player_name = self.get_player_name(card_id)
-        
+
         if rec['wins'] >= config.GAMETAPE_MAX_WINS:
             print(f"🌟 LEGENDARY! {player_name}'s {self.get_display_name(tape_id)} has entered the Hall of Fame!")
             self.game_state['hall_of_fame'].append(tape_id)
@@ -412,33 +553,53 @@ class GameManager:
             print(f"📉 CUT! {player_name}'s {self.get_display_name(tape_id)} has been sent to the G-League (Removed).")
             self.game_state['gametapes'][card_id].remove(tape_id)
 
-    def generate_random_opponent(self):
+    def _build_opponent_unit(self, cand):
+        """Try to turn one card-pool candidate into a battle unit"""
+        pid = cand['id']
+        season = cand['season']
+
+        stats = self.nba_manager.get_player_season_stats(pid, season)
+        if not stats: return None
+
+        games = self.nba_manager.get_player_games(pid, season)
+        if not games: return None
+
+        game = random.choice(games[:10])
+        moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=False)
+        valid, _ = self.nba_manager.validate_gametape(moves_data, game)
+        if not valid: return None
+        # Labels only for the accepted candidate
+        moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=True)
+
+        gametape = {'game_id': game['game_id'], 'game_stats': game, 'moves': moves_data}
+
+        card_mock = {'id': pid, 'full_name': f"{cand['full_name']} ({season})"}
+
+        unit = battle_engine.BattleUnit(card_mock, gametape, stats)
+        unit.season_stats = stats
+        unit.gametape = gametape
+        unit.tape_display_name = self.create_gametape_display_name(
+            game, stats, unit.labels)
+        return unit
+
+    def generate_random_opponents(self, n):
+        """Build n opponents from a single sample of the card pool.
+
+        Sampling once without replacement avoids repeated pool fetches
+        and guarantees distinct candidates across the team."""
         pool = self.nba_manager.get_available_card_pool()
-        for _ in range(20):
-            cand = random.choice(pool)
-            pid = cand['id']
-            season = cand['season']
-            
-            stats = self.nba_manager.get_player_season_stats(pid, season)
-            if not stats: continue
-            
-            games = self.nba_manager.get_player_games(pid, season)
-            if not games: continue
-            
-            game = random.choice(games[:10])
-            moves_data = self.nba_manager.get_game_moves(pid, game['game_id'], calculate_labels=True)
-            valid, _ = self.nba_manager.validate_gametape(moves_data, game)
-            
-            if valid:
-                gametape = {'game_id': game['game_id'], 'game_stats': game, 'moves': moves_data}
-                
-                card_mock = {'id': pid, 'full_name': f"{cand['full_name']} ({season})"}
-                
-                unit = battle_engine.BattleUnit(card_mock, gametape, stats)
-                unit.season_stats = stats
-                unit.gametape = gametape
-                return unit
-        return None
+        units = []
+        for cand in random.sample(pool, min(len(pool), n * 20)):
+            unit = self._build_opponent_unit(cand)
+            if unit:
+                units.append(unit)
+                if len(units) == n:
+                    break
+        return units
+
+    def generate_random_opponent(self):
+        units = self.generate_random_opponents(1)
+        return units[0] if units else None
 
     def shop_menu(self):
         print(f"\n🛒 SHOP | Tokens: {self.game_state['tokens']}")
@@ -468,11 +629,11 @@ class GameManager:
             games = self.nba_manager.get_player_games(cand['id'], cand['season'])
             valid_tape = None
             for g in random.sample(games, min(5, len(games))):
-                # Calculate labels at purchase time
-                m = self.nba_manager.get_game_moves(cand['id'], g['game_id'], calculate_labels=True)
+                m = self.nba_manager.get_game_moves(cand['id'], g['game_id'], calculate_labels=False)
                 if self.nba_manager.validate_gametape(m, g)[0]:
                     valid_tape = g
-                    # Capture labels for display name
+                    # Labels only for the purchased tape
+                    m = self.nba_manager.get_game_moves(cand['id'], g['game_id'], calculate_labels=True)
                     valid_labels = m.get('labels', [])
                     break
             
@@ -483,11 +644,10 @@ class GameManager:
                 
                 tid = f"{cand['id']}_{valid_tape['game_id']}"
                 self.game_state['gametapes'][card_id] = [tid]
-                self.game_state['gametape_records'][tid] = {'wins':0, 'losses':0}
-                
+
                 # Pass captured labels to name generator
                 tname = self.create_gametape_display_name(valid_tape, stats, valid_labels)
-                self.game_state['gametape_metadata'][tid] = tname
+                self.game_state['tapes'][tid] = {'wins': 0, 'losses': 0, 'name': tname}
                 
                 print(f"✅ Purchased: {cand['full_name']} ({cand['season']})")
                 self.save_game()
@@ -505,27 +665,27 @@ class GameManager:
         card_id = self.game_state['player_cards'][idx]
         pid, season = self.parse_card_id(card_id)
         
-        games = self.nba_manager.get_player_games(pid, season)
-        for _ in range(20):
-            g = random.choice(games)
-            tid = f"{pid}_{g['game_id']}"
-            if tid in self.game_state['gametapes'][card_id]: continue
-            
-            # Calculate labels at purchase time
-            m = self.nba_manager.get_game_moves(pid, g['game_id'], calculate_labels=True)
-            if self.nba_manager.validate_gametape(m, g)[0]:
-                self.game_state['tokens'] -= config.GAMETAPE_COST
-                self.game_state['gametapes'][card_id].append(tid)
-                self.game_state['gametape_records'][tid] = {'wins':0, 'losses':0}
-                
-                stats = self.nba_manager.get_player_season_stats(pid, season)
-                tname = self.create_gametape_display_name(g, stats, m.get('labels', []))
-                self.game_state['gametape_metadata'][tid] = tname
-                
-                print(f"✅ Bought Tape: {tname}")
-                self.save_game()
-                return
-        print("No new valid tapes found for this player/season.")
+        owned = set(self.game_state['gametapes'][card_id])
+        candidates = [g for g in self._valid_games(pid, season)
+                      if f"{pid}_{g['game_id']}" not in owned]
+        if not candidates:
+            print("No new valid tapes found for this player/season.")
+            return
+
+        g = random.choice(candidates)
+        tid = f"{pid}_{g['game_id']}"
+        # Calculate labels at purchase time
+        m = self.nba_manager.get_game_moves(pid, g['game_id'], calculate_labels=True)
+
+        self.game_state['tokens'] -= config.GAMETAPE_COST
+        self.game_state['gametapes'][card_id].append(tid)
+
+        stats = self.nba_manager.get_player_season_stats(pid, season)
+        tname = self.create_gametape_display_name(g, stats, m.get('labels', []))
+        self.game_state['tapes'][tid] = {'wins': 0, 'losses': 0, 'name': tname}
+        
+        print(f"✅ Bought Tape: {tname}")
+        self.save_game()
 
     def sell_menu(self):
         print("\nWhat to sell?")
@@ -536,14 +696,14 @@ class GameManager:
         elif choice == 2: self.sell_player()
 
     def sell_gametape(self):
-        all_tapes = []
-        for pid, tapes in self.game_state['gametapes'].items():
-            for tid in tapes: all_tapes.append((pid, tid))
-            
+        all_tapes = [(pid, tid)
+                     for pid, tapes in self.game_state['gametapes'].items()
+                     for tid in tapes]
+
+        # Resolve each owner name once; the row loop is pure formatting
+        names = {pid: self.get_player_name(pid) for pid in {p for p, _ in all_tapes}}
         for i, (pid, tid) in enumerate(all_tapes):
-            player_name = self.get_player_name(pid)
-            tape_name = self.get_display_name(tid)
-            print(f"{i+1}. {player_name} - {tape_name}")
+            print(f"{i+1}. {names[pid]} - {self.get_display_name(tid)}")
             
         choice = config.get_valid_input("Sell which? ", len(all_tapes)) - 1
         pid, tid = all_tapes[choice]
@@ -619,8 +779,7 @@ class GameManager:
         choice = config.get_valid_input("Choice: ", len(gametapes)) - 1
         tid = gametapes[choice]
         
-        game_id = tid.split('_')[1]
-        player_id = tid.split('_')[0]
+        player_id, game_id = self.parse_tape_id(tid)
         moves_data = self.nba_manager.get_game_moves(player_id, game_id, calculate_labels=False)
         
         if not moves_data or not moves_data.get('moves'):
@@ -628,10 +787,7 @@ class GameManager:
             return
 
         moves = moves_data['moves']
-        counts = {}
-        for m in moves:
-            t = m['type']
-            counts[t] = counts.get(t, 0) + 1
+        counts = Counter(m['type'] for m in moves)
             
         print(f"\n📺 PREVIEW: {self.get_display_name(tid)}")
         print(f"Total Moves: {len(moves)}")
@@ -641,13 +797,21 @@ class GameManager:
         print("-" * 30)
         input("Press Enter to return...")
 
+    def get_valid_roster(self):
+        """Cards that still own at least one tape, in roster order"""
+        gametapes = self.game_state['gametapes']
+        return [cid for cid in self.game_state['player_cards'] if gametapes.get(cid)]
+
     def get_display_name(self, gametape_id):
-        """Get display name from metadata or fallback to ID"""
-        return self.game_state.get('gametape_metadata', {}).get(gametape_id, gametape_id)
+        """Get display name from the tape table or fallback to ID"""
+        # 'tapes' always exists after init/migration, so index it
+        # directly instead of building a fallback dict per call
+        entry = self.game_state['tapes'].get(gametape_id)
+        return entry['name'] if entry and entry.get('name') else gametape_id
 
     def get_tape_record_str(self, gametape_id):
         """Helper to get W/L record string"""
-        rec = self.game_state['gametape_records'].get(gametape_id, {'wins': 0, 'losses': 0})
+        rec = self.game_state['tapes'].get(gametape_id, {'wins': 0, 'losses': 0})
         return f"[W:{rec['wins']} L:{rec['losses']}]"
 
 def main():
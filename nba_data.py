@@ -4,19 +4,160 @@ Replaces API calls with local SQLite queries for instant performance.
 """
 
 import sqlite3
+import heapq
 import json
 import random
+import threading
+from collections import OrderedDict
 import game_config as config
 
 DB_FILE = 'nba_stats.db'
 
+# Canonical move dicts shared by every generated tape; consumers only
+# read them, so one allocation per type serves all expansions
+MOVE_TEMPLATES = {
+    'attack': {'type': 'attack', 'description': 'Made 2PT'},
+    'strong_attack': {'type': 'strong_attack', 'description': 'Made 3PT'},
+    'weak_attack': {'type': 'weak_attack', 'description': 'Made FT'},
+    'miss': {'type': 'miss', 'description': 'Missed Shot'},
+    'defensive_rebound': {'type': 'defensive_rebound', 'description': 'D-Reb'},
+    'offensive_rebound': {'type': 'offensive_rebound', 'description': 'O-Reb'},
+    'assist': {'type': 'assist', 'description': 'Assist'},
+    'steal': {'type': 'steal', 'description': 'Steal'},
+    'block': {'type': 'block', 'description': 'Block'},
+    'turnover': {'type': 'turnover', 'description': 'Turnover'},
+    'foul': {'type': 'foul', 'description': 'Foul'},
+}
+
+# Cache-miss sentinel: lets _LRUCache.get distinguish a miss from a
+# legitimately cached empty result
+_MISS = object()
+
+
+class _LRUCache(OrderedDict):
+    """Bounded memo dict: reads refresh recency, inserts evict the
+    least recently used entry once maxsize is exceeded. The manager is
+    shared across session threads, so every access takes a lock;
+    lookups must go through get() — an `in` check followed by [] can
+    race with another thread's eviction."""
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = super().__getitem__(key)
+            except KeyError:
+                return default
+            self.move_to_end(key)
+            return value
+
+
 class NBADataManager:
     def __init__(self):
-        # Connect to local database
-        # check_same_thread=False allows simple usage across game loops
-        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row  # Access columns by name
-        self.cache = {} # Keep memory cache for super-speed
+        # One connection per thread: the manager is shared across
+        # Streamlit session threads via st.cache_resource, and sqlite3
+        # serializes every call on a shared connection. Each thread
+        # lazily opens its own (see the conn property); WAL mode lets
+        # the readers and the occasional write-through run in parallel.
+        # Connections stay writable because the flat-table and label
+        # caches populate lazily.
+        self._local = threading.local()
+        # Memory cache for super-speed; bounded so a long session can't
+        # grow without limit. Sized to hold a full primed stats sweep
+        # plus the active deck's games/moves/box-score entries.
+        self.cache = _LRUCache(8192)
+        self._stats_primed = False
+
+        # Composite indexes matching the query predicates: (player,
+        # season, date) streams get_player_games without a sort pass and
+        # (player, game) makes the move lookups point reads. No-ops once
+        # created; skipped quietly if the database file is read-only.
+        try:
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gl_player_season_date
+                ON game_logs(player_id, season_id, game_date DESC)
+            """)
+            self.conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_gl_player_game
+                ON game_logs(player_id, game_id)
+            """)
+            self.conn.commit()
+        except Exception:
+            pass
+
+        # Flattened box-score fields: label detection only needs a few
+        # scalars per (game, player), so parsed games are written here
+        # once and later reads skip the multi-KB JSON blob entirely.
+        # Skipped quietly if the database file is read-only.
+        try:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS box_scores_flat (
+                    game_id TEXT NOT NULL,
+                    player_id TEXT NOT NULL,
+                    usg_pct REAL,
+                    ast_to REAL,
+                    deflections INTEGER,
+                    charges_drawn INTEGER,
+                    screen_assists INTEGER,
+                    pct_ast_3pm REAL,
+                    PRIMARY KEY (game_id, player_id)
+                )
+            """)
+            # Labels are deterministic per (player, game), so computed
+            # results persist here and later sessions skip detection
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS gametape_labels (
+                    player_id TEXT NOT NULL,
+                    game_id TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    PRIMARY KEY (player_id, game_id)
+                )
+            """)
+            self.conn.commit()
+        except Exception:
+            pass
+
+    @property
+    def conn(self):
+        """This thread's database connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # cached_statements raised above the hot-query count so
+            # every per-battle SQL string keeps its prepared plan
+            conn = sqlite3.connect(DB_FILE, cached_statements=256)
+            conn.row_factory = sqlite3.Row  # Access columns by name
+            # Read-mostly workload: WAL + relaxed sync cut per-query
+            # locking overhead, a bigger page cache and mmap keep hot
+            # rows in memory, and temp sort/group state stays off disk.
+            # Ignored quietly on read-only filesystems. busy_timeout
+            # covers write-through collisions between threads.
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA cache_size=-65536")   # 64 MB
+                conn.execute("PRAGMA mmap_size=268435456") # 256 MB
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute("PRAGMA busy_timeout=5000")
+            except Exception:
+                pass
+            self._local.conn = conn
+        return conn
 
     def get_all_players(self):
         """Get all players present in the database (Legacy support)"""
@@ -24,26 +165,17 @@ class NBADataManager:
         try:
             cursor = self.conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT p.id, p.full_name
+                SELECT p.id, p.full_name
                 FROM players p
                 JOIN game_logs g ON p.id = g.player_id
+                WHERE g.min >= ?
+                GROUP BY p.id, p.full_name
                 ORDER BY p.full_name
-            """)
-            rows = cursor.fetchall()
-            
-            players = []
-            for r in rows:
-                parts = r['full_name'].split(' ', 1)
-                first = parts[0]
-                last = parts[1] if len(parts) > 1 else ''
-                
-                players.append({
-                    'id': r['id'],
-                    'full_name': r['full_name'],
-                    'first_name': first,
-                    'last_name': last
-                })
-            return players
+            """, (config.MIN_MINUTES_PLAYED,))
+            # No caller reads first/last separately, so skip the
+            # per-row name split and hand back thin dicts
+            return [{'id': r['id'], 'full_name': r['full_name']}
+                    for r in cursor.fetchall()]
         except Exception as e:
             print(f"Database Error (get_all_players): {e}")
             return []
@@ -53,16 +185,43 @@ class NBADataManager:
         NEW: Returns a list of every valid (Player + Season) combination.
         This is used for the Shop and Starter selection to support multiple seasons.
         """
+        pool = self.cache.get('card_pool', _MISS)
+        if pool is not _MISS: return pool
+
         try:
+            # Materialize the combos once; the DISTINCT scan over all of
+            # game_logs then never runs again (skipped if read-only)
+            try:
+                self.conn.execute("""
+                    CREATE TABLE IF NOT EXISTS card_pool AS
+                    SELECT DISTINCT g.player_id, g.season_id, p.full_name
+                    FROM game_logs g
+                    JOIN players p ON g.player_id = p.id
+                """)
+                self.conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_cp_name
+                    ON card_pool(full_name, season_id DESC)
+                """)
+                self.conn.commit()
+            except Exception:
+                pass
+            
             cursor = self.conn.cursor()
-            # Get every player-season combo that has enough games
-            cursor.execute("""
-                SELECT DISTINCT g.player_id, g.season_id, p.full_name
-                FROM game_logs g
-                JOIN players p ON g.player_id = p.id
-                ORDER BY p.full_name, g.season_id DESC
-            """)
-            rows = cursor.fetchall()
+            try:
+                cursor.execute("""
+                    SELECT player_id, season_id, full_name FROM card_pool
+                    ORDER BY full_name, season_id DESC
+                """)
+                rows = cursor.fetchall()
+            except Exception:
+                # Read-only database without the summary table: scan
+                cursor.execute("""
+                    SELECT DISTINCT g.player_id, g.season_id, p.full_name
+                    FROM game_logs g
+                    JOIN players p ON g.player_id = p.id
+                    ORDER BY p.full_name, g.season_id DESC
+                """)
+                rows = cursor.fetchall()
             
             pool = []
             for r in rows:
@@ -71,15 +230,67 @@ class NBADataManager:
                     'season': r['season_id'],
                     'full_name': r['full_name']
                 })
+            self.cache['card_pool'] = pool
             return pool
         except Exception as e:
             print(f"Database Error (get_available_card_pool): {e}")
             return []
 
+    def prime_stats_cache(self):
+        """Bulk-load season averages for every (player, season) at once.
+
+        One GROUP BY replaces the per-player AVG() queries when callers
+        walk the card pool; players under the minutes floor are filtered
+        in SQL just like the scalar path filters them after the fact.
+        """
+        if self._stats_primed: return
+        self._stats_primed = True
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT 
+                    player_id,
+                    season_id,
+                    count(*) as GP,
+                    AVG(min) as MIN,
+                    AVG(pts) as PTS,
+                    AVG(ast) as AST,
+                    AVG(tov) as TOV,
+                    AVG(reb) as REB,
+                    AVG(stl) as STL,
+                    AVG(blk) as BLK,
+                    AVG(fgm) as FGM,
+                    AVG(fga) as FGA,
+                    AVG(fg3m) as FG3M,
+                    AVG(fg3a) as FG3A,
+                    AVG(ftm) as FTM,
+                    AVG(fta) as FTA
+                FROM game_logs
+                GROUP BY player_id, season_id
+                HAVING AVG(min) >= ?
+            """, (config.MIN_AVERAGE_MPG,))
+
+            for row in cursor.fetchall():
+                stats = dict(row)
+                stats['season'] = stats.pop('season_id')
+                stats['games_played'] = stats['GP']
+                self.cache[f"stats_{stats['player_id']}_{stats['season']}"] = stats
+        except Exception as e:
+            print(f"Database Error (prime_stats_cache): {e}")
+
     def get_player_season_stats(self, player_id, season='2024-25'):
         """Calculate season averages from local game logs"""
         cache_key = f"stats_{player_id}_{season}"
-        if cache_key in self.cache: return self.cache[cache_key]
+        cached = self.cache.get(cache_key, _MISS)
+        if cached is not _MISS: return cached
+
+        # First miss fills the whole cache in one query; anything still
+        # absent afterwards falls through to the scalar lookup below
+        if not self._stats_primed:
+            self.prime_stats_cache()
+            cached = self.cache.get(cache_key, _MISS)
+            if cached is not _MISS: return cached
 
         try:
             cursor = self.conn.cursor()
@@ -101,7 +312,9 @@ class NBADataManager:
                     AVG(fta) as FTA
                 FROM game_logs
                 WHERE player_id = ? AND season_id = ?
-            """, (player_id, season))
+                GROUP BY player_id, season_id
+                HAVING AVG(min) >= ?
+            """, (player_id, season, config.MIN_AVERAGE_MPG))
             
             row = cursor.fetchone()
             
@@ -113,9 +326,6 @@ class NBADataManager:
             stats['season'] = season
             stats['games_played'] = stats['GP']
             
-            if stats['MIN'] < config.MIN_AVERAGE_MPG:
-                return None
-                
             self.cache[cache_key] = stats
             return stats
             
@@ -126,30 +336,27 @@ class NBADataManager:
     def get_player_games(self, player_id, season='2024-25'):
         """Get all games for a player from local DB"""
         cache_key = f"games_{player_id}_{season}"
-        if cache_key in self.cache: return self.cache[cache_key]
+        cached = self.cache.get(cache_key, _MISS)
+        if cached is not _MISS: return cached
 
         try:
             cursor = self.conn.cursor()
+            # The 'date' alias prevents KeyError in game_manager; the
+            # minutes filter runs in SQLite so DNP rows never reach
+            # Python. Columns are listed explicitly (move generation,
+            # label rules, deviation multipliers, display name) so rows
+            # ship only what the callers read.
             cursor.execute("""
-                SELECT * FROM game_logs 
-                WHERE player_id = ? AND season_id = ?
+                SELECT player_id, game_id, game_date, game_date AS date,
+                       matchup, min, pts, reb, ast, stl, blk, tov,
+                       fgm, fga, fg3m, fg3a, ftm, fta,
+                       dreb, oreb, pf, plus_minus
+                FROM game_logs 
+                WHERE player_id = ? AND season_id = ? AND min >= ?
                 ORDER BY game_date DESC
-            """, (player_id, season))
+            """, (player_id, season, config.MIN_MINUTES_PLAYED))
             
-            rows = cursor.fetchall()
-            games = []
-            
-            for r in rows:
-                if r['min'] < config.MIN_MINUTES_PLAYED:
-                    continue
-                    
-                game_data = dict(r)
-                # FIX: Map 'game_date' to 'date' to prevent KeyError in game_manager
-                if 'game_date' in game_data:
-                    game_data['date'] = game_data['game_date']
-                
-                games.append(game_data)
-                
+            games = [dict(r) for r in cursor.fetchall()]
             self.cache[cache_key] = games
             return games
             
@@ -159,14 +366,44 @@ class NBADataManager:
 
     def get_game_moves(self, player_id, game_id, calculate_labels=False):
         """Generate moves and labels from local data"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM game_logs WHERE player_id=? AND game_id=?", (player_id, game_id))
-        row = cursor.fetchone()
+        cache_key = f"moves_{player_id}_{game_id}_{calculate_labels}"
+        cached = self.cache.get(cache_key, _MISS)
+        if cached is not _MISS: return cached
+
+        try:
+            # One round-trip: pull the game log and the player's
+            # flattened box-score scalars together. conn.execute skips
+            # the throwaway Cursor on this hottest query
+            row = self.conn.execute("""
+                SELECT g.player_id, g.game_id, g.game_date, g.matchup,
+                       g.min, g.pts, g.reb, g.ast, g.stl, g.blk, g.tov,
+                       g.fgm, g.fga, g.fg3m, g.fg3a, g.ftm, g.fta,
+                       g.dreb, g.oreb, g.pf, g.plus_minus,
+                       f.usg_pct, f.ast_to, f.deflections,
+                       f.charges_drawn, f.screen_assists, f.pct_ast_3pm
+                FROM game_logs g
+                LEFT JOIN box_scores_flat f
+                    ON f.game_id = g.game_id
+                    AND f.player_id = CAST(g.player_id AS TEXT)
+                WHERE g.player_id=? AND g.game_id=?
+            """, (player_id, game_id)).fetchone()
+        except Exception:
+            # box_scores_flat may be missing on a read-only database
+            row = self.conn.execute("""
+                SELECT player_id, game_id, game_date, matchup,
+                       min, pts, reb, ast, stl, blk, tov,
+                       fgm, fga, fg3m, fg3a, ftm, fta,
+                       dreb, oreb, pf, plus_minus
+                FROM game_logs WHERE player_id=? AND game_id=?
+            """, (player_id, game_id)).fetchone()
         
         if not row:
             return self.get_fallback_moves()
             
         game_stats = dict(row)
+        flat = {k: game_stats.pop(k, None) for k in
+                ('usg_pct', 'ast_to', 'deflections', 'charges_drawn',
+                 'screen_assists', 'pct_ast_3pm')}
         # FIX: Map 'game_date' to 'date'
         if 'game_date' in game_stats:
             game_stats['date'] = game_stats['game_date']
@@ -175,135 +412,242 @@ class NBADataManager:
         
         labels = []
         if calculate_labels:
-            labels = self.detect_gametape_labels_offline(player_id, game_id, game_stats)
+            labels = self._get_stored_labels(player_id, game_id)
+            if labels is None:
+                player_data = None
+                if any(v is not None for v in flat.values()):
+                    player_data = {
+                        'USG_PCT': flat['usg_pct'],
+                        'AST_TO': flat['ast_to'],
+                        'DEFLECTIONS': flat['deflections'],
+                        'CHARGES_DRAWN': flat['charges_drawn'],
+                        'SCREEN_ASSISTS': flat['screen_assists'],
+                        'PCT_AST_3PM': flat['pct_ast_3pm']
+                    }
+                labels = self.detect_gametape_labels_offline(player_id, game_id, game_stats, player_data)
+                self._store_labels(player_id, game_id, labels)
             moves = self.apply_label_bonuses(moves, labels)
             
         plus_minus = game_stats.get('plus_minus', 0)
         
-        return {
+        result = {
             'moves': moves,
             'labels': labels,
             'plus_minus': plus_minus
         }
+        self.cache[cache_key] = result
+        return result
 
-    def detect_gametape_labels_offline(self, player_id, game_id, game_stats):
-        """Query box_scores table for advanced JSON data"""
-        labels = []
-        label_scores = {}
+    def _get_boxscore_index(self, game_id):
+        """Get a game's flattened box-score fields keyed by player id"""
+        cache_key = f"boxscore_{game_id}"
+        cached = self.cache.get(cache_key, _MISS)
+        if cached is not _MISS:
+            return cached
         
         cursor = self.conn.cursor()
-        cursor.execute("SELECT data_json FROM box_scores WHERE game_id=?", (game_id,))
-        row = cursor.fetchone()
         
-        advanced_stats = {}
-        hustle_stats = {}
-        usage_stats = {}
-        scoring_stats = {}
+        # Fast path: the game was flattened on an earlier run
+        index = {}
+        try:
+            cursor.execute("""
+                SELECT player_id, usg_pct, ast_to, deflections,
+                       charges_drawn, screen_assists, pct_ast_3pm
+                FROM box_scores_flat WHERE game_id=?
+            """, (game_id,))
+            for r in cursor.fetchall():
+                index[r['player_id']] = {
+                    'USG_PCT': r['usg_pct'],
+                    'AST_TO': r['ast_to'],
+                    'DEFLECTIONS': r['deflections'],
+                    'CHARGES_DRAWN': r['charges_drawn'],
+                    'SCREEN_ASSISTS': r['screen_assists'],
+                    'PCT_AST_3PM': r['pct_ast_3pm']
+                }
+        except Exception:
+            pass
+        
+        if not index:
+            # Fallback: parse the raw JSON blob and flatten it
+            cursor.execute("SELECT data_json FROM box_scores WHERE game_id=?", (game_id,))
+            row = cursor.fetchone()
+            if row:
+                try:
+                    full_data = json.loads(row['data_json'])
+                    merged = {}
+                    for dataset in ('advanced', 'hustle', 'usage', 'scoring'):
+                        for p in full_data.get(dataset, []):
+                            # Handle string/int mismatches on ID
+                            pid = p.get('PLAYER_ID')
+                            if pid is None:
+                                pid = p.get('personId')
+                            merged.setdefault(str(pid), {}).update(p)
+                    for pid, p in merged.items():
+                        index[pid] = {
+                            'USG_PCT': p.get('USG_PCT', 0.2),
+                            'AST_TO': p.get('AST_TO', 0.0),
+                            'DEFLECTIONS': p.get('DEFLECTIONS', 0),
+                            'CHARGES_DRAWN': p.get('CHARGES_DRAWN', 0),
+                            'SCREEN_ASSISTS': p.get('SCREEN_ASSISTS', 0),
+                            'PCT_AST_3PM': p.get('PCT_AST_3PM', 0.0)
+                        }
+                except:
+                    pass
+            
+            # Write-through so the next session skips the JSON parse
+            # (silently skipped on a read-only database file)
+            if index:
+                try:
+                    self.conn.executemany("""
+                        INSERT OR REPLACE INTO box_scores_flat
+                        (game_id, player_id, usg_pct, ast_to, deflections,
+                         charges_drawn, screen_assists, pct_ast_3pm)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, [(game_id, pid, p['USG_PCT'], p['AST_TO'],
+                           p['DEFLECTIONS'], p['CHARGES_DRAWN'],
+                           p['SCREEN_ASSISTS'], p['PCT_AST_3PM'])
+                          for pid, p in index.items()])
+                    self.conn.commit()
+                except Exception:
+                    pass
         
-        if row:
-            try:
-                full_data = json.loads(row['data_json'])
-                def find_player(dataset):
-                    for p in dataset:
-                        # Handle string/int mismatches on ID
-                        if str(p.get('PLAYER_ID')) == str(player_id) or str(p.get('personId')) == str(player_id):
-                            return p
-                    return {}
-
-                advanced_stats = find_player(full_data.get('advanced', []))
-                hustle_stats = find_player(full_data.get('hustle', []))
-                usage_stats = find_player(full_data.get('usage', []))
-                scoring_stats = find_player(full_data.get('scoring', []))
-            except:
-                pass 
+        self.cache[cache_key] = index
+        return index
+
+    def _get_stored_labels(self, player_id, game_id):
+        """Fetch previously computed labels, or None on a miss"""
+        try:
+            row = self.conn.execute(
+                "SELECT labels FROM gametape_labels WHERE player_id=? AND game_id=?",
+                (str(player_id), str(game_id))).fetchone()
+            if row:
+                return json.loads(row['labels'])
+        except Exception:
+            pass
+        return None
+
+    def _store_labels(self, player_id, game_id, labels):
+        """Persist computed labels (skipped on a read-only database)"""
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO gametape_labels (player_id, game_id, labels) VALUES (?, ?, ?)",
+                (str(player_id), str(game_id), json.dumps(labels)))
+            self.conn.commit()
+        except Exception:
+            pass
+
+    def detect_gametape_labels_offline(self, player_id, game_id, game_stats, player_data=None):
+        """Score labels from the player's flattened box-score fields"""
+        labels = []
+        label_scores = {}
+        
+        if player_data is None:
+            player_data = self._get_boxscore_index(game_id).get(str(player_id), {})
+
+        if player_data:
+            usg_pct = player_data.get('USG_PCT', 0.2)
+            if usg_pct < 1: usg_pct *= 100
+            deflections = player_data.get('DEFLECTIONS', 0)
+            charges = player_data.get('CHARGES_DRAWN', 0)
+            screen_assists = player_data.get('SCREEN_ASSISTS', 0)
+            ast_to = player_data.get('AST_TO', 0.0)
+            pct_ast_3pm = player_data.get('PCT_AST_3PM', 0.0)
+        else:
+            # No box score for this game: bake the defaults in directly
+            # instead of hashing five missing keys
+            usg_pct = 20.0
+            deflections = charges = screen_assists = 0
+            ast_to = pct_ast_3pm = 0.0
 
         # --- LOGIC ---
+        # Pull every field once; the rules below reuse the locals
         pts, reb, ast = game_stats['pts'], game_stats['reb'], game_stats['ast']
-        stl, blk = game_stats['stl'], game_stats['blk']
-        doubles = sum([1 for x in [pts, reb, ast, stl, blk] if x >= 10])
-        if doubles >= 3: label_scores['Triple Double'] = 1
+        stl, blk, tov = game_stats['stl'], game_stats['blk'], game_stats['tov']
+        fgm, fga = game_stats['fgm'], game_stats['fga']
+        fg3m, fg3a = game_stats['fg3m'], game_stats['fg3a']
+        fta, pf = game_stats['fta'], game_stats['pf']
+        oreb, dreb = game_stats['oreb'], game_stats['dreb']
+        mins, pm = game_stats['min'], game_stats['plus_minus']
         
-        usg_pct = usage_stats.get('USG_PCT', 0.2)
-        if usg_pct < 1: usg_pct *= 100
+        doubles = (pts >= 10) + (reb >= 10) + (ast >= 10) + (stl >= 10) + (blk >= 10)
+        if doubles >= 3: label_scores['Triple Double'] = 1
         
-        if game_stats['min'] <= 24 and pts >= 15:
-            fg_pct = game_stats['fgm'] / game_stats['fga'] if game_stats['fga'] > 0 else 0
+        if mins <= 24 and pts >= 15:
+            fg_pct = fgm / fga if fga > 0 else 0
             if fg_pct > 0.48: label_scores['Microwave'] = 2
             
-        deflections = hustle_stats.get('DEFLECTIONS', 0)
-        charges = hustle_stats.get('CHARGES_DRAWN', 0)
         if deflections == 0 and charges == 0:
-            if stl >= 2 and game_stats['pf'] >= 4: label_scores['Stopper'] = 3
+            if stl >= 2 and pf >= 4: label_scores['Stopper'] = 3
         elif deflections >= 2 and charges >= 1:
             label_scores['Stopper'] = 3
             
-        screen_assists = hustle_stats.get('SCREEN_ASSISTS', 0)
         if screen_assists == 0:
-            if game_stats['oreb'] >= 3 and game_stats['pf'] >= 4: label_scores['Bruiser'] = 4
+            if oreb >= 3 and pf >= 4: label_scores['Bruiser'] = 4
         elif screen_assists >= 4:
             label_scores['Bruiser'] = 4
             
-        if game_stats['plus_minus'] > 10 and ast >= 3 and pts <= 15:
+        if pm > 10 and ast >= 3 and pts <= 15:
             label_scores['Glue Guy'] = 5
             
-        ast_to = advanced_stats.get('AST_TO', 0.0)
-        if ast_to == 0 and game_stats['tov'] > 0: ast_to = ast / game_stats['tov']
+        if ast_to == 0 and tov > 0: ast_to = ast / tov
         if ast >= 6 and ast_to > 3.0:
             label_scores['Floor General'] = 6
             
-        if blk >= 2 and game_stats['dreb'] >= 8:
+        if blk >= 2 and dreb >= 8:
             label_scores['Rim Protector'] = 7
             
-        fta, fga = game_stats['fta'], game_stats['fga']
-        if fga > 0 and fta >= 6 and game_stats['fg3a'] <= 3 and (fta/fga) > 0.35:
+        if fga > 0 and fta >= 6 and fg3a <= 3 and (fta/fga) > 0.35:
             label_scores['Slasher'] = 8
             
-        pct_ast_3pm = scoring_stats.get('PCT_AST_3PM', 0.0)
-        if game_stats['fg3m'] >= 2 and pct_ast_3pm > 0.75 and usg_pct < 18:
+        if fg3m >= 2 and pct_ast_3pm > 0.75 and usg_pct < 18:
             label_scores['3 and D'] = 9
             
-        sorted_labels = sorted(label_scores.items(), key=lambda x: x[1])
-        return [label for label, _ in sorted_labels[:2]]
+        # Only the two best-scoring labels survive; no need to sort all
+        return [label for label, _ in
+                heapq.nsmallest(2, label_scores.items(), key=lambda x: x[1])]
 
     def generate_moves_from_game_stats(self, game_stats):
+        t = MOVE_TEMPLATES
         moves = []
         
         # Attacks
         fgm_2pt = game_stats['fgm'] - game_stats['fg3m']
-        for _ in range(max(0, fgm_2pt)): moves.append({'type': 'attack', 'description': 'Made 2PT'})
-        for _ in range(game_stats['fg3m']): moves.append({'type': 'strong_attack', 'description': 'Made 3PT'})
-        for _ in range(game_stats['ftm']): moves.append({'type': 'weak_attack', 'description': 'Made FT'})
+        moves.extend([t['attack']] * max(0, fgm_2pt))
+        moves.extend([t['strong_attack']] * game_stats['fg3m'])
+        moves.extend([t['weak_attack']] * game_stats['ftm'])
         
         # Misses
         misses = (game_stats['fga'] - game_stats['fgm']) + (game_stats['fta'] - game_stats['ftm'])
-        for _ in range(misses): moves.append({'type': 'miss', 'description': 'Missed Shot'})
+        moves.extend([t['miss']] * misses)
         
         # Others
-        for _ in range(game_stats['dreb']): moves.append({'type': 'defensive_rebound', 'description': 'D-Reb'})
-        for _ in range(game_stats['oreb']): moves.append({'type': 'offensive_rebound', 'description': 'O-Reb'})
-        for _ in range(game_stats['ast']): moves.append({'type': 'assist', 'description': 'Assist'})
-        for _ in range(game_stats['stl']): moves.append({'type': 'steal', 'description': 'Steal'})
-        for _ in range(game_stats['blk']): moves.append({'type': 'block', 'description': 'Block'})
-        for _ in range(game_stats['tov']): moves.append({'type': 'turnover', 'description': 'Turnover'})
-        for _ in range(game_stats['pf']): moves.append({'type': 'foul', 'description': 'Foul'})
+        moves.extend([t['defensive_rebound']] * game_stats['dreb'])
+        moves.extend([t['offensive_rebound']] * game_stats['oreb'])
+        moves.extend([t['assist']] * game_stats['ast'])
+        moves.extend([t['steal']] * game_stats['stl'])
+        moves.extend([t['block']] * game_stats['blk'])
+        moves.extend([t['turnover']] * game_stats['tov'])
+        moves.extend([t['foul']] * game_stats['pf'])
         
         random.shuffle(moves)
         return moves
 
     def apply_label_bonuses(self, moves, labels):
+        if not labels:
+            return moves
         modified = moves.copy()
         for label in labels:
             if label == '3 and D':
                 rem_count = 0
                 new_moves = []
                 for m in modified:
-                    if m['type'] == 'miss' and rem_count < 2:
+                    if rem_count < 2 and m['type'] == 'miss':
                         rem_count += 1
                     else:
                         new_moves.append(m)
                 modified = new_moves
             elif label == 'Glue Guy':
-                for _ in range(4): modified.append({'type': 'weak_attack', 'description': 'Bonus FT'})
+                modified.extend([MOVE_TEMPLATES['weak_attack']] * 4)
         random.shuffle(modified)
         return modified
 
@@ -311,9 +655,18 @@ class NBADataManager:
         return {'moves': [], 'labels': [], 'plus_minus': 0}
 
     def validate_gametape(self, moves_data, game_stats):
+        # One pass over the tape instead of a filter plus a scan
         moves = moves_data.get('moves', [])
-        if len([m for m in moves if m['type'] != 'miss']) < config.MIN_MOVES_REQUIRED:
+        non_miss = 0
+        has_attack = False
+        for m in moves:
+            t = m['type']
+            if t != 'miss':
+                non_miss += 1
+            if t in ('attack', 'strong_attack', 'weak_attack'):
+                has_attack = True
+        if non_miss < config.MIN_MOVES_REQUIRED:
             return False, "Not enough moves"
-        if not any(m['type'] in ['attack', 'strong_attack', 'weak_attack'] for m in moves):
+        if not has_attack:
             return False, "No attacks"
         return True, "Valid"
\ No newline at end of file